@@ -0,0 +1,223 @@
+import argparse
+import json
+import csv
+import os
+import sys
+from src.config import (
+    DATA_PROCESSED,
+    DTYPE_BACKEND,
+    SAMPLE_FRACTION,
+    SAMPLE_SEED,
+    COMPARISON_WINDOWS,
+    API_HOST,
+    API_PORT,
+    PIPELINE_STATUS_FILE
+)
+
+# Only argparse, csv and src.config load at startup; every subcommand
+# imports the Dask/matplotlib/requests stack it needs inside its handler.
+
+
+def _quiet_warnings():
+    import warnings
+    warnings.filterwarnings('ignore')
+
+
+def cmd_ingest(args):
+    _quiet_warnings()
+    from pipeline import ingest
+    from src.progress import tracked_run
+    tracked_run(ingest, sample=args.sample, seed=args.seed)
+
+
+def cmd_run(args):
+    _quiet_warnings()
+    from pipeline import main
+    from src.progress import tracked_run
+    tracked_run(main, sample=args.sample, seed=args.seed)
+
+
+def cmd_monitor(args):
+    _quiet_warnings()
+    from pipeline import update_monitoring
+    from src.progress import tracked_run
+    tracked_run(update_monitoring)
+
+
+def cmd_status(args):
+    if not os.path.exists(PIPELINE_STATUS_FILE):
+        print("No pipeline run recorded yet")
+        return 1
+
+    with open(PIPELINE_STATUS_FILE) as f:
+        status = json.load(f)
+
+    print(f"State:   {status['state']} (updated {status['updated_at']})")
+    print(f"Stage:   {status['stage']} (since {status['stage_started']})")
+    compute = status.get('compute')
+    if compute:
+        eta = compute['eta_seconds']
+        print(f"Compute: {compute['tasks_done']:,}/{compute['tasks_total']:,} tasks, "
+              f"{compute['bytes'] / 1e6:,.1f} MB at {compute['throughput_bytes_per_s'] / 1e6:,.1f} MB/s, "
+              f"ETA {'?' if eta is None else f'{eta:,.0f}s'}")
+    for done in status['completed_stages']:
+        print(f"   ✅ {done['stage']:<22} {done['seconds']:>9,.1f}s")
+    return 0
+
+
+def cmd_cancel(args):
+    from src.progress import request_cancel
+    request_cancel()
+
+
+def cmd_metrics(args):
+    name = 'summary_statistics_preview.csv' if args.preview else 'summary_statistics.csv'
+    path = os.path.join(DATA_PROCESSED, name)
+    if not os.path.exists(path):
+        print(f"❌ {name} not found. Run: python audit.py run")
+        return 1
+
+    with open(path, newline='') as f:
+        summary = next(csv.DictReader(f))
+
+    width = max(len(key) for key in summary)
+    for key, value in summary.items():
+        try:
+            number = float(value)
+            if number.is_integer():
+                value = f"{number:,.0f}"
+            else:
+                value = f"{number:,.4g}" if abs(number) < 1000 else f"{number:,.2f}"
+        except ValueError:
+            pass
+        print(f"{key:<{width}}  {value}")
+    return 0
+
+
+def cmd_plot(args):
+    _quiet_warnings()
+    import pandas as pd
+    from src.windows import make_window, period_labels
+    from src.visualizations import (
+        plot_border_effect,
+        plot_trip_volume_change,
+        plot_quantile_heatmaps,
+        plot_event_study
+    )
+
+    print("📊 Re-plotting from saved outputs...")
+
+    windows_path = os.path.join(DATA_PROCESSED, 'comparison_windows.csv')
+    if os.path.exists(windows_path):
+        window = make_window(**COMPARISON_WINDOWS[0])
+        base_label, treat_label = period_labels(window)
+        frame = pd.read_csv(windows_path)
+        frame = frame[frame['window'] == window['name']]
+
+        for analysis, index_name, plot in [
+            ('volume', 'taxi_type', plot_trip_volume_change),
+            ('border', 'dropoff_loc', plot_border_effect)
+        ]:
+            table = frame[frame['analysis'] == analysis].rename(
+                columns={'key': index_name, 'baseline': base_label, 'treatment': treat_label}
+            ).set_index(index_name)[[base_label, treat_label, 'pct_change']]
+            if not table.empty:
+                plot(table)
+
+    quantiles_path = os.path.join(DATA_PROCESSED, 'trip_quantiles.parquet')
+    if os.path.exists(quantiles_path):
+        plot_quantile_heatmaps(pd.read_parquet(quantiles_path), metric=args.metric)
+
+    events_path = os.path.join(DATA_PROCESSED, 'event_study.csv')
+    if os.path.exists(events_path):
+        plot_event_study(pd.read_csv(events_path))
+
+
+def cmd_weather(args):
+    _quiet_warnings()
+    from src.data_loader import load_all_data
+    from src.cleaners import flag_ghost_trips
+    from src.weather import fetch_weather_data, calculate_rain_elasticity
+    from src.visualizations import plot_rain_elasticity
+
+    weather_df = fetch_weather_data()
+    if weather_df is None:
+        return 1
+
+    ddf, is_ghost = flag_ghost_trips(load_all_data(dtype_backend=DTYPE_BACKEND))
+    correlation, wettest_data = calculate_rain_elasticity(ddf[~is_ghost], weather_df)
+    if correlation is not None:
+        print(f"Rain Elasticity (Correlation): {correlation:.4f}")
+    if wettest_data is not None and not wettest_data.empty:
+        plot_rain_elasticity(wettest_data)
+    return 0
+
+
+def cmd_bench(args):
+    _quiet_warnings()
+    from benchmark import main
+    main(args.taxi_type, args.year, args.month)
+
+
+def cmd_serve(args):
+    from src.results_api import serve
+    serve(args.host, args.port)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='audit', description="NYC congestion pricing audit")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for name, handler, help_text in [
+        ('ingest', cmd_ingest, "load, de-duplicate and flag ghost trips (phase 1 only)"),
+        ('run', cmd_run, "run the full pipeline")
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument(
+            '--sample', nargs='?', type=float, const=SAMPLE_FRACTION, default=None,
+            help=f"stratified row-group sample (default fraction {SAMPLE_FRACTION})"
+        )
+        command.add_argument('--seed', type=int, default=SAMPLE_SEED, help="sample seed")
+        command.set_defaults(handler=handler)
+
+    command = commands.add_parser('monitor', help="append series for new raw files and score new days")
+    command.set_defaults(handler=cmd_monitor)
+
+    command = commands.add_parser('status', help="show progress of the current or last run")
+    command.set_defaults(handler=cmd_status)
+
+    command = commands.add_parser('cancel', help="stop the running pipeline, keeping finished stages")
+    command.set_defaults(handler=cmd_cancel)
+
+    command = commands.add_parser('metrics', help="print summary metrics from the last run")
+    command.add_argument('--preview', action='store_true', help="show the sample-run estimates")
+    command.set_defaults(handler=cmd_metrics)
+
+    command = commands.add_parser('plot', help="redraw figures from saved aggregates")
+    command.add_argument('--metric', default='speed_mph', help="quantile heatmap metric")
+    command.set_defaults(handler=cmd_plot)
+
+    command = commands.add_parser('weather', help="fetch weather and compute rain elasticity")
+    command.set_defaults(handler=cmd_weather)
+
+    command = commands.add_parser('serve', help="serve saved aggregates over a local read-only HTTP API")
+    command.add_argument('--host', default=API_HOST)
+    command.add_argument('--port', type=int, default=API_PORT)
+    command.set_defaults(handler=cmd_serve)
+
+    command = commands.add_parser('bench', help="compare pandas and Arrow backends on one month")
+    command.add_argument('taxi_type', nargs='?', default='yellow')
+    command.add_argument('year', nargs='?', type=int, default=2025)
+    command.add_argument('month', nargs='?', type=int, default=1)
+    command.set_defaults(handler=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import warnings
+warnings.filterwarnings('ignore')
+
+import time
+import os
+import sys
+import pandas as pd
+from src.data_loader import load_taxi_data
+from src.cleaners import flag_ghost_trips
+from src.geospatial import identify_zone_trips, calculate_compliance_rate
+from src.od_matrix import build_od_matrices
+from src.config import DATA_PROCESSED
+
+
+def run_backend(dtype_backend, taxi_type, year, month):
+    timings = {'backend': dtype_backend or 'numpy'}
+
+    start = time.perf_counter()
+    ddf = load_taxi_data(taxi_type, year, month, dtype_backend=dtype_backend)
+    if ddf is None:
+        return None
+    ddf = ddf.persist()
+    timings['load_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ddf, is_ghost = flag_ghost_trips(ddf)
+    timings['ghost_count'] = int(is_ghost.sum().compute())
+    timings['ghost_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ddf = identify_zone_trips(ddf)
+    timings['entering'] = int(ddf['enters_zone'].sum().compute())
+    timings['zone_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    timings['compliance_rate'], _ = calculate_compliance_rate(build_od_matrices(ddf))
+    timings['compliance_s'] = time.perf_counter() - start
+
+    timings['total_s'] = timings['ghost_s'] + timings['zone_s'] + timings['compliance_s']
+    return timings
+
+
+def main(taxi_type='yellow', year=2025, month=1):
+    print("=" * 60)
+    print(f"⏱️  BACKEND BENCHMARK: {taxi_type} {year}-{month:02d}")
+    print("=" * 60)
+
+    results = []
+    for backend in [None, 'pyarrow']:
+        print(f"\n▶️  Running {backend or 'numpy'} backend...")
+        timings = run_backend(backend, taxi_type, year, month)
+        if timings is not None:
+            results.append(timings)
+
+    if not results:
+        print("❌ No data files found for benchmark")
+        return None
+
+    results_df = pd.DataFrame(results).set_index('backend')
+    if len(results_df) == 2:
+        results_df.loc['speedup'] = results_df.loc['numpy'] / results_df.loc['pyarrow']
+        results_df.loc['speedup', ['ghost_count', 'entering', 'compliance_rate']] = None
+
+    print("\n📊 Results:")
+    print(results_df.round(3))
+
+    os.makedirs(DATA_PROCESSED, exist_ok=True)
+    results_df.to_csv(os.path.join(DATA_PROCESSED, 'backend_benchmark.csv'))
+    return results_df
+
+
+if __name__ == "__main__":
+    args = [int(a) if a.isdigit() else a for a in sys.argv[1:]]
+    main(*args)
@@ -1,10 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from PIL import Image
 import os
-from src.config import OUTPUT_FIGURES, DATA_PROCESSED
+import json
+from src.config import (
+    OUTPUT_FIGURES,
+    DATA_PROCESSED,
+    DATA_AUDIT,
+    PIPELINE_STATUS_FILE,
+    PIPELINE_CANCEL_FILE
+)
+from src.monitoring import load_series, daily_series, MONITOR_METRICS
 
 st.set_page_config(
     page_title="NYC Congestion Audit 2025",
@@ -15,6 +20,44 @@ st.set_page_config(
 st.title("🚖 NYC Congestion Pricing Audit 2025")
 st.markdown("**Interactive Dashboard** | Data-Driven Policy Analysis")
 
+
+def pipeline_status():
+    if not os.path.exists(PIPELINE_STATUS_FILE):
+        return
+    with open(PIPELINE_STATUS_FILE) as f:
+        status = json.load(f)
+    
+    st.header("🛰️ Pipeline Status")
+    st.caption(f"{status['state']} | stage: {status['stage']} | updated {status['updated_at']}")
+    
+    compute = status.get('compute')
+    if status['state'] == 'running' and compute and compute['tasks_total']:
+        eta = compute['eta_seconds']
+        st.progress(
+            compute['tasks_done'] / compute['tasks_total'],
+            text=f"{compute['tasks_done']:,}/{compute['tasks_total']:,} tasks | "
+                 f"{compute['throughput_bytes_per_s'] / 1e6:,.1f} MB/s | ETA {'?' if eta is None else f'{eta:,.0f}s'}"
+        )
+    
+    if status['state'] == 'running':
+        if os.path.exists(PIPELINE_CANCEL_FILE) or status['cancel_requested']:
+            st.warning("Cancellation requested")
+        elif st.button("🛑 Cancel run"):
+            with open(PIPELINE_CANCEL_FILE, 'w') as f:
+                f.write(status['updated_at'])
+    
+    if status['completed_stages']:
+        with st.expander(f"{len(status['completed_stages'])} completed stages"):
+            st.dataframe(pd.DataFrame(status['completed_stages']), use_container_width=True)
+
+
+# Refreshes on its own every few seconds while the rest of the page stays put
+if hasattr(st, 'fragment'):
+    pipeline_status = st.fragment(run_every=3)(pipeline_status)
+
+with st.sidebar:
+    pipeline_status()
+
 try:
     summary_df = pd.read_csv(os.path.join(DATA_PROCESSED, 'summary_statistics.csv'))
     summary = summary_df.iloc[0]
@@ -22,27 +65,79 @@ except:
     st.error("❌ Please run pipeline.py first to generate data!")
     st.stop()
 
+@st.cache_resource
+def load_od():
+    # Loaded once per server; the arrays are shared, not copied per rerun
+    from src.od_matrix import load_od_matrices
+    return load_od_matrices()
+
+
+@st.cache_data
+def load_geojson():
+    from src.zone_geometry import load_zone_geojson
+    return load_zone_geojson()
+
+
+@st.cache_data
+def zone_metrics(period):
+    from src.zone_map import zone_metric_frame
+    return zone_metric_frame(load_od(), period)
+
+
 st.sidebar.header("📊 Key Metrics")
 st.sidebar.metric("Total Revenue", f"${summary['total_revenue']:,.0f}")
 st.sidebar.metric("Compliance Rate", f"{summary['compliance_rate']:.1f}%")
 st.sidebar.metric("Ghost Trips Detected", f"{summary['ghost_trip_count']:,.0f}")
 st.sidebar.metric("Rain Elasticity", f"{summary['rain_elasticity']:.3f}")
 
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "🗺️ The Map", 
     "⚡ The Flow", 
     "💰 The Economics", 
-    "🌧️ The Weather"
+    "🌧️ The Weather",
+    "🚨 Anomalies"
 ])
 
 with tab1:
+    st.header("Taxi Zone Map")
+    
+    geojson = load_geojson()
+    od = load_od()
+    if geojson is None or not od:
+        st.warning("⚠️ Zone map needs data/reference/taxi_zones_simplified.geojson and OD matrices. "
+                   "Run pipeline.py and python -m src.zone_geometry first.")
+    else:
+        import plotly.express as px
+        from src.zone_map import MAP_METRICS, map_periods
+        
+        periods = map_periods(od)
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            period = st.selectbox("Period", periods, index=len(periods) - 1)
+        with col2:
+            metric = st.radio("Metric", list(MAP_METRICS), format_func=MAP_METRICS.get, horizontal=True)
+        
+        diverging = metric == 'dropoff_change_pct'
+        fig = px.choropleth(
+            zone_metrics(period),
+            geojson=geojson,
+            locations='LocationID',
+            color=metric,
+            hover_data=list(MAP_METRICS),
+            color_continuous_scale='RdBu_r' if diverging else 'Viridis',
+            color_continuous_midpoint=0 if diverging else None,
+            labels={metric: MAP_METRICS[metric]}
+        )
+        fig.update_geos(fitbounds='locations', visible=False)
+        fig.update_layout(height=600, margin=dict(l=0, r=0, t=0, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+    
     st.header("Border Effect Analysis")
     st.markdown("**Hypothesis**: Passengers end trips just outside the zone to avoid toll")
     
     img_path = os.path.join(OUTPUT_FIGURES, 'border_effect.png')
     if os.path.exists(img_path):
-        img = Image.open(img_path)
-        st.image(img, use_container_width=True)
+        st.image(img_path, use_container_width=True)
     else:
         st.warning("⚠️ Chart not found. Run pipeline.py first.")
     
@@ -63,13 +158,13 @@ with tab2:
         st.subheader("Q1 2024 (Before)")
         img_2024 = os.path.join(OUTPUT_FIGURES, 'speed_heatmap_2024.png')
         if os.path.exists(img_2024):
-            st.image(Image.open(img_2024), use_container_width=True)
+            st.image(img_2024, use_container_width=True)
     
     with col2:
         st.subheader("Q1 2025 (After)")
         img_2025 = os.path.join(OUTPUT_FIGURES, 'speed_heatmap_2025.png')
         if os.path.exists(img_2025):
-            st.image(Image.open(img_2025), use_container_width=True)
+            st.image(img_2025, use_container_width=True)
     
     st.markdown("### Analysis")
     st.markdown("""
@@ -84,7 +179,7 @@ with tab3:
     
     img_tip = os.path.join(OUTPUT_FIGURES, 'tip_vs_surcharge.png')
     if os.path.exists(img_tip):
-        st.image(Image.open(img_tip), use_container_width=True)
+        st.image(img_tip, use_container_width=True)
     else:
         st.warning("⚠️ Chart not found.")
     
@@ -98,7 +193,7 @@ with tab3:
     st.subheader("Trip Volume Change")
     img_volume = os.path.join(OUTPUT_FIGURES, 'trip_volume_change.png')
     if os.path.exists(img_volume):
-        st.image(Image.open(img_volume), use_container_width=True)
+        st.image(img_volume, use_container_width=True)
 
 with tab4:
     st.header("Rain Elasticity of Demand")
@@ -106,7 +201,7 @@ with tab4:
     
     img_rain = os.path.join(OUTPUT_FIGURES, 'rain_elasticity.png')
     if os.path.exists(img_rain):
-        st.image(Image.open(img_rain), use_container_width=True)
+        st.image(img_rain, use_container_width=True)
     else:
         st.warning("⚠️ Chart not found.")
     
@@ -124,5 +219,38 @@ with tab4:
         st.info(f"⚪ **INELASTIC**: Weak correlation ({elasticity:.3f})")
         st.markdown("Rain has minimal impact on demand")
 
+with tab5:
+    st.header("Daily Monitoring Alerts")
+    st.markdown("**Question**: Did surcharge collection or data quality break on a specific day?")
+    
+    daily = daily_series(load_series())
+    anomalies_path = os.path.join(DATA_AUDIT, 'anomalies.parquet')
+    anomalies = pd.read_parquet(anomalies_path) if os.path.exists(anomalies_path) else pd.DataFrame()
+    
+    if daily.empty:
+        st.warning("⚠️ No monitoring series found. Run pipeline.py first.")
+    else:
+        # Plotly is only imported once there is a series to draw
+        import plotly.express as px
+        import plotly.graph_objects as go
+        
+        metric = st.selectbox("Metric", MONITOR_METRICS)
+        series = daily[metric].dropna().reset_index()
+        series.columns = ['date', metric]
+        fig = px.line(series, x='date', y=metric)
+        
+        if not anomalies.empty:
+            flagged = anomalies[anomalies['metric'] == metric]
+            fig.add_trace(go.Scatter(
+                x=flagged['date'], y=flagged['value'], mode='markers',
+                marker=dict(color='red', size=10), name='Anomaly'
+            ))
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if anomalies.empty:
+            st.success("✅ No anomalous days flagged")
+        else:
+            st.dataframe(anomalies.sort_values('date', ascending=False), use_container_width=True)
+
 st.markdown("---")
 st.markdown("**Data Source**: NYC TLC Trip Record Data | **Analysis Period**: 2024-2025")
\ No newline at end of file
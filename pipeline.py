@@ -1,101 +1,266 @@
 import warnings
 warnings.filterwarnings('ignore')
 
-from src.data_loader import load_all_data, check_december_2025
-from src.cleaners import detect_ghost_trips, get_ghost_trip_summary
-from src.geospatial import (
-    identify_zone_trips, 
-    calculate_compliance_rate,
-    analyze_border_effect
+from src.data_loader import load_files, check_december_2025
+from src.cleaners import (
+    remove_duplicate_trips,
+    detect_ghost_trips,
+    get_ghost_trip_summary,
+    flag_ghost_trips
 )
-from src.analytics import (
-    calculate_trip_volume_change,
-    calculate_average_speed_by_time,
-    calculate_tip_vs_surcharge,
-    calculate_total_revenue
+from src.fare_anomalies import detect_fare_anomalies
+from src.geospatial import identify_zone_trips, calculate_compliance_rate
+from src.analytics import calculate_tip_vs_surcharge, calculate_total_revenue
+from src.od_matrix import (
+    build_od_matrices,
+    save_od_matrices,
+    combine_od,
+    od_leakage_corridors
 )
+from src.windows import (
+    make_window,
+    rolling_windows,
+    load_window_data,
+    evaluate_windows,
+    summarize_window,
+    windows_to_frame,
+    window_cluster_totals,
+    window_intervals,
+    add_window_intervals,
+    summary_intervals
+)
+from src.sketches import build_quantile_sketches, save_sketch, sketch_quantiles
+from src.event_study import build_daily_aggregates, save_daily_aggregates, run_all_event_studies
+from src.sampling import load_sample, estimate_preview_metrics
+from src.monitoring import (
+    series_partition,
+    pending_raw_files,
+    append_series,
+    run_anomaly_detection
+)
+from src.partials import reduce_partitions
+from src.progress import stage, tracked_run
 from src.weather import fetch_weather_data, calculate_rain_elasticity
 from src.visualizations import (
+    set_figure_dir,
     plot_border_effect,
     plot_speed_heatmap,
+    plot_quantile_heatmaps,
+    plot_event_study,
     plot_tip_vs_surcharge,
     plot_rain_elasticity,
     plot_trip_volume_change
 )
 import pandas as pd
+import argparse
 import os
-from src.config import OUTPUT_FIGURES, DATA_PROCESSED
+from src.config import (
+    OUTPUT_FIGURES,
+    PREVIEW_FIGURES,
+    DATA_PROCESSED,
+    DTYPE_BACKEND,
+    SAMPLE_FRACTION,
+    SAMPLE_SEED,
+    COMPARISON_WINDOWS,
+    ROLLING_WINDOWS,
+    ANALYSIS_PERIOD,
+    CONGESTION_START_DATE
+)
 
 os.makedirs(OUTPUT_FIGURES, exist_ok=True)
 os.makedirs(DATA_PROCESSED, exist_ok=True)
 
 
-def main():
+def update_monitoring():
+    # Incremental mode: only raw files without a stored series are scanned
     print("=" * 60)
-    print("🚖 NYC CONGESTION PRICING AUDIT 2025")
+    print("🚨 MONITORING UPDATE")
     print("=" * 60)
     
-    # PHASE 1: DATA ENGINEERING
+    pending = pending_raw_files()
+    if pending:
+        stage('monitoring scan')
+        print(f"\n📥 Scanning {len(pending)} new raw files...")
+        ddf = load_files(pending, dtype_backend=DTYPE_BACKEND)
+        # Same dedup as the full run, so appended days count trips the same way
+        ddf, _ = remove_duplicate_trips(ddf, audit_name='duplicate_trips_monitor.parquet')
+        flagged_ddf, _ = flag_ghost_trips(ddf)
+        append_series(reduce_partitions(flagged_ddf, series_partition))
+    else:
+        print("\n✅ No new raw files since the last update")
+    
+    stage('anomaly scoring')
+    run_anomaly_detection()
+
+
+def plan_windows():
+    windows = [make_window(**w) for w in COMPARISON_WINDOWS]
+    if ROLLING_WINDOWS:
+        windows += rolling_windows(**ROLLING_WINDOWS)
+    return windows
+
+
+def ingest(sample=None, seed=SAMPLE_SEED, windows=None):
     print("\n" + "="*60)
     print("PHASE 1: BIG DATA ENGINEERING")
     print("="*60)
     
     check_december_2025()
     
+    stage('load')
     print("\n📥 Loading taxi trip data...")
-    ddf = load_all_data()
-    
-    clean_ddf, ghost_df = detect_ghost_trips(ddf)
+    if sample:
+        ddf = load_sample(sample, seed, dtype_backend=DTYPE_BACKEND)
+        stage('deduplication')
+        ddf, duplicate_df = remove_duplicate_trips(ddf, audit_name='duplicate_trips_preview.parquet')
+        stage('ghost detection')
+        clean_ddf, ghost_df = detect_ghost_trips(
+            ddf,
+            audit_name='ghost_trips_preview.parquet',
+            quality_name='data_quality_preview.parquet',
+            monitor=False
+        )
+    else:
+        # Windows are planned first so the loader reads only what they and
+        # the analysis period need
+        ddf = load_window_data(windows or plan_windows(), [ANALYSIS_PERIOD], dtype_backend=DTYPE_BACKEND)
+        stage('deduplication')
+        ddf, duplicate_df = remove_duplicate_trips(ddf)
+        stage('ghost detection')
+        clean_ddf, ghost_df = detect_ghost_trips(ddf)
+        stage('anomaly scoring')
+        run_anomaly_detection()
     
     if not ghost_df.empty:
         print("\n📊 Ghost Trip Summary:")
         print(get_ghost_trip_summary(ghost_df))
     
+    stage('fare anomalies')
+    fare_anomaly_count = detect_fare_anomalies(
+        clean_ddf, audit_name='fare_anomalies_preview' if sample else 'fare_anomalies'
+    )
+    
+    return ddf, duplicate_df, clean_ddf, ghost_df, fare_anomaly_count
+
+
+def main(sample=None, seed=SAMPLE_SEED):
+    print("=" * 60)
+    print("🚖 NYC CONGESTION PRICING AUDIT 2025")
+    if sample:
+        print(f"   PREVIEW MODE: stratified row-group sample ({sample:.1%})")
+        set_figure_dir(PREVIEW_FIGURES, preview=True)
+    print("=" * 60)
+    
+    windows = plan_windows()
+    
+    # PHASE 1: DATA ENGINEERING
+    ddf, duplicate_df, clean_ddf, ghost_df, fare_anomaly_count = ingest(sample, seed, windows)
+    
     print("\n" + "="*60)
     print("PHASE 2: CONGESTION ZONE IMPACT ANALYSIS")
     print("="*60)
+    if sample:
+        print("ℹ️  Preview: everything is weighted up to full-run estimates. Summary metrics,")
+        print("   window volumes and border dropoffs carry 95% CIs; speeds, OD matrices, the")
+        print("   event study and quantiles are point estimates (labelled so in the figures)")
     
+    stage('zone identification')
     print("\n🗺️  Identifying congestion zone trips...")
     clean_ddf = identify_zone_trips(clean_ddf)
     
+    stage('od matrices')
+    print("\n🧮 Building origin-destination matrices...")
+    od = build_od_matrices(clean_ddf)
+    if od and not sample:
+        save_od_matrices(od)
+    
+    stage('compliance')
     print("\n📋 Calculating surcharge compliance...")
-    compliance_rate, top_leakage = calculate_compliance_rate(clean_ddf)
+    compliance_rate, top_leakage = calculate_compliance_rate(od)
     print(f"Compliance Rate: {compliance_rate:.2f}%")
     if not top_leakage.empty:
         print("\nTop 3 Pickup Locations with Missing Surcharges:")
         print(top_leakage)
     
-    print("\n📉 Analyzing trip volume changes (Q1 2024 vs Q1 2025)...")
-    volume_df = calculate_trip_volume_change(clean_ddf)
+    stage('comparison windows')
+    print("\n🪟 Evaluating comparison windows...")
+    window_results = evaluate_windows(clean_ddf, windows)
+    window_frame = windows_to_frame(window_results, windows)
+    primary = summarize_window(window_results, windows[0])
+    if not sample:
+        window_frame.to_csv(os.path.join(DATA_PROCESSED, 'comparison_windows.csv'), index=False)
+    else:
+        cluster_totals = window_cluster_totals(clean_ddf, windows)
+        if cluster_totals is not None and not window_frame.empty:
+            window_frame = add_window_intervals(window_frame, window_intervals(cluster_totals, windows))
+            primary = summary_intervals(primary, window_frame, windows[0])
+        window_frame.to_csv(os.path.join(DATA_PROCESSED, 'comparison_windows_preview.csv'), index=False)
+    
+    print(f"\n📉 Analyzing trip volume changes ({windows[0]['name']})...")
+    volume_df = primary['volume']
     print(volume_df)
     
+    stage('event study')
+    print("\n📈 Running difference-in-differences event study...")
+    daily = build_daily_aggregates(clean_ddf)
+    events_df = pd.DataFrame()
+    if daily is not None:
+        did_df, events_df = run_all_event_studies(daily)
+        if not sample:
+            save_daily_aggregates(daily)
+            did_df.to_csv(os.path.join(DATA_PROCESSED, 'did_estimates.csv'), index=False)
+            events_df.to_csv(os.path.join(DATA_PROCESSED, 'event_study.csv'), index=False)
+    
     print("\n🚧 Analyzing border effect...")
-    border_comparison = analyze_border_effect(clean_ddf)
+    border_comparison = primary['border']
+    print(f"   ✅ Analyzed {len(border_comparison)} border zones")
+    
+    if od:
+        corridors = od_leakage_corridors(combine_od(od, start=CONGESTION_START_DATE))
+        if not corridors.empty:
+            print(f"\nTop Leakage Corridors (since {CONGESTION_START_DATE}, entering zone without surcharge):")
+            print(corridors)
     
     print("\n" + "="*60)
     print("PHASE 3: VISUAL AUDIT")
     print("="*60)
     
+    stage('visualizations')
     print("\n📊 Generating visualizations...")
     
     if not border_comparison.empty:
         plot_border_effect(border_comparison)
     
     print("\n⏱️  Calculating average speeds...")
-    speed_pivot = calculate_average_speed_by_time(clean_ddf)
+    speed_pivot = primary['speed']
     plot_speed_heatmap(speed_pivot)
     
+    stage('quantile sketches')
+    print("\n📐 Building quantile sketches (speed, duration, fare, tip %)...")
+    sketch = build_quantile_sketches(clean_ddf)
+    if sketch is not None:
+        quantiles_df = sketch_quantiles(sketch)
+        if not sample:
+            save_sketch(sketch)
+            quantiles_df.to_parquet(os.path.join(DATA_PROCESSED, 'trip_quantiles.parquet'))
+        plot_quantile_heatmaps(quantiles_df, metric='speed_mph')
+    
+    stage('tips')
     print("\n💰 Analyzing tip crowding out effect...")
     monthly_stats = calculate_tip_vs_surcharge(clean_ddf)
     plot_tip_vs_surcharge(monthly_stats)
     
     plot_trip_volume_change(volume_df)
     
+    plot_event_study(events_df)
+    
     print("\n" + "="*60)
     print("PHASE 4: RAIN TAX ANALYSIS")
     print("="*60)
     
+    stage('weather')
     weather_df = fetch_weather_data()
+    correlation = None
     
     if weather_df is not None:
 
@@ -121,22 +286,41 @@ def main():
     print("PHASE 5: REVENUE ANALYSIS")
     print("="*60)
     
+    stage('revenue')
     print("\n💵 Calculating total 2025 surcharge revenue...")
-    revenue_stats = calculate_total_revenue(clean_ddf)
+    revenue_stats = calculate_total_revenue(od)
     print(f"Total Revenue: ${revenue_stats['total_revenue']:,.2f}")
     print(f"Average Surcharge per Trip: ${revenue_stats['avg_surcharge']:.2f}")
     
+    stage('summary')
     print("\n💾 Saving summary statistics...")
     summary_stats = {
         'total_revenue': revenue_stats['total_revenue'],
         'avg_surcharge': revenue_stats['avg_surcharge'],
         'compliance_rate': compliance_rate,
         'ghost_trip_count': len(ghost_df),
+        'duplicate_trip_count': len(duplicate_df),
+        'fare_anomaly_count': fare_anomaly_count,
         'rain_elasticity': correlation if correlation is not None else 0
     }
     
-    summary_df = pd.DataFrame([summary_stats])
-    summary_df.to_csv(os.path.join(DATA_PROCESSED, 'summary_statistics.csv'), index=False)
+    if sample:
+        print("\n🎯 Scaling preview metrics to full-run estimates...")
+        flagged_ddf = identify_zone_trips(flag_ghost_trips(ddf)[0])
+        preview = estimate_preview_metrics(flagged_ddf, revenue_stats['avg_surcharge'])
+        print(preview.round(3))
+        print("   Duplicate and fare-anomaly counts are raw sample counts (not scaled)")
+        preview.to_csv(os.path.join(DATA_PROCESSED, 'preview_estimates.csv'))
+        
+        summary_stats['total_revenue'] = preview.loc['total_revenue', 'estimate']
+        summary_stats['compliance_rate'] = preview.loc['compliance_rate', 'estimate']
+        summary_stats['ghost_trip_count'] = preview.loc['ghost_trip_count', 'estimate']
+        
+        summary_df = pd.DataFrame([summary_stats])
+        summary_df.to_csv(os.path.join(DATA_PROCESSED, 'summary_statistics_preview.csv'), index=False)
+    else:
+        summary_df = pd.DataFrame([summary_stats])
+        summary_df.to_csv(os.path.join(DATA_PROCESSED, 'summary_statistics.csv'), index=False)
     
     print("\n" + "="*60)
     print("✅ PIPELINE COMPLETED SUCCESSFULLY")
@@ -149,4 +333,19 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="NYC congestion pricing audit pipeline")
+    parser.add_argument(
+        '--sample', nargs='?', type=float, const=SAMPLE_FRACTION, default=None,
+        help=f"preview on a stratified row-group sample (default fraction {SAMPLE_FRACTION})"
+    )
+    parser.add_argument('--seed', type=int, default=SAMPLE_SEED, help="sample seed")
+    parser.add_argument(
+        '--monitor', action='store_true',
+        help="only append series for new raw files and score new days for anomalies"
+    )
+    args = parser.parse_args()
+    
+    if args.monitor:
+        tracked_run(update_monitoring)
+    else:
+        tracked_run(main, sample=args.sample, seed=args.seed)
\ No newline at end of file
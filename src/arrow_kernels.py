@@ -0,0 +1,89 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+import pandas as pd
+from src.config import (
+    CONGESTION_ZONE_IDS,
+    BORDER_ZONE_IDS,
+    MAX_SPEED_MPH,
+    MIN_TELEPORT_TIME_MINUTES,
+    MIN_TELEPORT_FARE,
+    MIN_STATIONARY_FARE
+)
+from src.zone_distances import implausible_distance_mask
+
+ZONE_VALUE_SET = pa.array(CONGESTION_ZONE_IDS, type=pa.int32())
+BORDER_VALUE_SET = pa.array(BORDER_ZONE_IDS, type=pa.int32())
+
+
+def is_arrow_backed(ddf):
+    return isinstance(ddf['pickup_time'].dtype, pd.ArrowDtype)
+
+
+def _arrow(series):
+    # ArrowExtensionArray hands back its buffers without a copy
+    return pa.array(series.array)
+
+
+def _series(arr, index):
+    return pd.Series(pd.arrays.ArrowExtensionArray(arr), index=index)
+
+
+def _is_in(arr, value_set):
+    return pc.is_in(pc.cast(arr, pa.int32()), value_set=value_set)
+
+
+def arrow_ghost_columns(df):
+    pickup = _arrow(df['pickup_time'])
+    dropoff = _arrow(df['dropoff_time'])
+    distance = _arrow(df['trip_distance'])
+    fare = _arrow(df['fare'])
+
+    seconds = pc.cast(pc.seconds_between(pickup, dropoff), pa.float64())
+    hours = pc.divide(seconds, 3600.0)
+    minutes = pc.divide(seconds, 60.0)
+
+    speed = pc.divide(distance, hours)
+    speed = pc.if_else(pc.is_finite(speed), speed, 0.0)
+    speed = pc.fill_null(speed, 0.0)
+
+    is_impossible_speed = pc.fill_null(pc.greater(speed, MAX_SPEED_MPH), False)
+    is_teleporter = pc.fill_null(pc.and_(
+        pc.less(minutes, MIN_TELEPORT_TIME_MINUTES),
+        pc.greater(fare, MIN_TELEPORT_FARE)
+    ), False)
+    is_stationary = pc.fill_null(pc.and_(
+        pc.equal(distance, 0),
+        pc.greater(fare, MIN_STATIONARY_FARE)
+    ), False)
+
+    is_implausible_distance = pa.array(implausible_distance_mask(df).to_numpy())
+
+    reason = pc.if_else(is_stationary, 'Stationary Ride', 'Clean')
+    reason = pc.if_else(is_implausible_distance, 'Implausible Distance', reason)
+    reason = pc.if_else(is_teleporter, 'Teleporter', reason)
+    reason = pc.if_else(is_impossible_speed, 'Impossible Speed', reason)
+
+    df = df.copy()
+    df['trip_duration_hours'] = _series(hours, df.index)
+    df['speed_mph'] = _series(speed, df.index)
+    df['trip_duration_minutes'] = _series(minutes, df.index)
+    df['ghost_reason'] = _series(reason, df.index)
+    return df
+
+
+def arrow_zone_columns(df):
+    pickup_loc = _arrow(df['pickup_loc'])
+    dropoff_loc = _arrow(df['dropoff_loc'])
+
+    starts = pc.fill_null(_is_in(pickup_loc, ZONE_VALUE_SET), False)
+    ends = pc.fill_null(_is_in(dropoff_loc, ZONE_VALUE_SET), False)
+
+    df = df.copy()
+    df['starts_in_zone'] = _series(starts, df.index)
+    df['ends_in_zone'] = _series(ends, df.index)
+    df['enters_zone'] = _series(pc.and_(pc.invert(starts), ends), df.index)
+    df['dropoff_at_border'] = _series(
+        pc.fill_null(_is_in(dropoff_loc, BORDER_VALUE_SET), False), df.index
+    )
+    return df
+
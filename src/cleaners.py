@@ -7,6 +7,11 @@ from src.config import (
     MIN_STATIONARY_FARE,
     DATA_AUDIT
 )
+from src.arrow_kernels import is_arrow_backed, arrow_ghost_columns
+from src.partials import reduce_partitions
+from src.quality import profile_partition, save_quality_report
+from src.monitoring import series_partition, append_series
+from src.zone_distances import load_distance_matrices, implausible_distance_mask
 import os
 import numpy as np
 
@@ -23,42 +28,214 @@ def calculate_speed(ddf):
     return ddf
 
 
-def detect_ghost_trips(ddf):
-    print("\n🔍 Detecting ghost trips...")
+def hash_trip_keys(df):
+    # Canonical key: whole seconds for times, cents for money and distance,
+    # so re-issued records with float noise still hash to the same uint64
+    def seconds(col):
+        ts = df[col].to_numpy(dtype='datetime64[s]', na_value=np.datetime64('NaT'))
+        return ts.astype(np.int64)
     
-    # Calculate speed
-    ddf = calculate_speed(ddf)
+    def cents(col):
+        return np.round(df[col].to_numpy(dtype=float, na_value=np.nan) * 100).astype(np.int64)
     
-    # Calculate trip duration in minutes
-    ddf['trip_duration_minutes'] = (
-        (ddf['dropoff_time'] - ddf['pickup_time']).dt.total_seconds() / 60
-    )
+    key = pd.DataFrame({
+        'pickup': seconds('pickup_time'),
+        'dropoff': seconds('dropoff_time'),
+        'pickup_loc': df['pickup_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64),
+        'dropoff_loc': df['dropoff_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64),
+        'distance': cents('trip_distance'),
+        'fare': cents('fare')
+    })
+    return pd.util.hash_pandas_object(key, index=False).to_numpy(dtype=np.uint64)
+
+
+def _add_trip_hash(df):
+    df = df.copy()
+    df['trip_hash'] = hash_trip_keys(df)
+    return df
+
+
+def _source_files(df):
+    if 'source_file' in df.columns:
+        return df['source_file'].astype(str).to_numpy()
+    return np.full(len(df), '', dtype=object)
+
+
+def _row_ids(df, partition_info):
+    # Partition number and position within it: a global row order that both
+    # passes over the same frame reproduce, files being read in order
+    number = partition_info['number'] if partition_info else 0
+    return (np.int64(number) << 32) + np.arange(len(df), dtype=np.int64)
+
+
+def _slim_keys(df, partition_info=None):
+    return pd.DataFrame({
+        'trip_hash': hash_trip_keys(df),
+        'source_file': _source_files(df),
+        'row_id': _row_ids(df, partition_info)
+    }, index=df.index)
+
+
+def _duplicate_groups(df):
+    # After the hash shuffle every copy of a trip sits in the same partition.
+    # The keeper is the first copy from the earliest source file.
+    df = df.sort_values(['trip_hash', 'source_file', 'row_id'])
+    sizes = df.groupby('trip_hash', sort=False).size()
+    first = df.drop_duplicates('trip_hash').set_index('trip_hash')
+    groups = first[sizes.reindex(first.index).to_numpy() > 1]
+    return pd.DataFrame({
+        'trip_hash': groups.index.to_numpy(dtype=np.uint64),
+        'copies': sizes.reindex(groups.index).to_numpy(dtype=np.int64),
+        'keeper_file': groups['source_file'].to_numpy(dtype=object),
+        'keeper_row': groups['row_id'].to_numpy(dtype=np.int64)
+    })
+
+
+def _mark_duplicates(df, dup_hashes, keeper_files, keeper_rows, partition_info=None):
+    # Exactly one row per duplicated hash is the keeper; everything else is a duplicate
+    hashes = df['trip_hash'].to_numpy()
+    is_duplicate = np.zeros(len(df), dtype=bool)
     
-    # Define ghost trip rules
-    print("   Applying ghost trip rules...")
+    if len(dup_hashes) > 0:
+        pos = np.clip(np.searchsorted(dup_hashes, hashes), 0, len(dup_hashes) - 1)
+        in_group = dup_hashes[pos] == hashes
+        keeper = (
+            in_group &
+            (_source_files(df) == keeper_files[pos]) &
+            (_row_ids(df, partition_info) == keeper_rows[pos])
+        )
+        is_duplicate = in_group & ~keeper
     
-    is_impossible_speed = ddf['speed_mph'] > MAX_SPEED_MPH
+    df = df.copy()
+    df['is_duplicate'] = is_duplicate
+    return df
+
+
+def remove_duplicate_trips(ddf, audit_name='duplicate_trips.parquet'):
+    print("\n🧬 Detecting duplicate trips...")
     
-    is_teleporter = (
-        (ddf['trip_duration_minutes'] < MIN_TELEPORT_TIME_MINUTES) & 
-        (ddf['fare'] > MIN_TELEPORT_FARE)
-    )
+    try:
+        print("   Hashing canonical trip keys and shuffling by hash...")
+        slim = ddf.map_partitions(
+            _slim_keys, meta={'trip_hash': 'uint64', 'source_file': 'object', 'row_id': 'int64'}
+        )
+        groups = (
+            slim.shuffle('trip_hash')
+            .map_partitions(
+                _duplicate_groups,
+                meta={'trip_hash': 'uint64', 'copies': 'int64', 'keeper_file': 'object', 'keeper_row': 'int64'}
+            )
+            .compute()
+            .sort_values('trip_hash')
+        )
+        
+        duplicate_count = int((groups['copies'] - 1).sum())
+        print(f"   Found {len(groups):,} duplicated trips ({duplicate_count:,} extra copies)")
+        
+        dup_hashes = groups['trip_hash'].to_numpy(dtype=np.uint64)
+        keeper_files = groups['keeper_file'].to_numpy(dtype=object)
+        keeper_rows = groups['keeper_row'].to_numpy(dtype=np.int64)
+        
+        marked = ddf.map_partitions(_add_trip_hash).map_partitions(
+            _mark_duplicates, dup_hashes, keeper_files, keeper_rows
+        )
+        deduped = marked[~marked['is_duplicate']].drop(columns=['is_duplicate'])
+        
+        if duplicate_count == 0:
+            return deduped, pd.DataFrame()
+        
+        print("💾 Saving duplicate trips to audit log...")
+        duplicate_ddf = marked[marked['is_duplicate']]
+        if duplicate_count > 100000:
+            print(f"   (Sampling 100,000 for storage efficiency)")
+            duplicate_ddf = duplicate_ddf.sample(frac=100000/duplicate_count, random_state=42)
+        duplicates = duplicate_ddf.compute()
+        
+        os.makedirs(DATA_AUDIT, exist_ok=True)
+        duplicates.to_parquet(os.path.join(DATA_AUDIT, audit_name), index=False)
+        print(f"✅ Duplicate trips saved: {len(duplicates):,} records")
+        
+        return deduped, duplicates
     
-    is_stationary = (ddf['trip_distance'] == 0) & (ddf['fare'] > MIN_STATIONARY_FARE)
+    except Exception as e:
+        print(f"   ⚠️  Error detecting duplicates: {e}")
+        import traceback
+        traceback.print_exc()
+        return ddf, pd.DataFrame()
+
+
+def flag_ghost_trips(ddf):
+    if load_distance_matrices() is None:
+        print("   ⚠️  Zone distance matrix not found, skipping distance plausibility rule "
+              "(build it with: python -m src.zone_distances)")
+    
+    if is_arrow_backed(ddf):
+        print("   Applying ghost trip rules (Arrow kernels)...")
+        ddf = ddf.map_partitions(arrow_ghost_columns)
+        is_ghost = ddf['ghost_reason'] != 'Clean'
+    else:
+        # Calculate speed
+        ddf = calculate_speed(ddf)
+        
+        # Calculate trip duration in minutes
+        ddf['trip_duration_minutes'] = (
+            (ddf['dropoff_time'] - ddf['pickup_time']).dt.total_seconds() / 60
+        )
+        
+        # Define ghost trip rules
+        print("   Applying ghost trip rules...")
+        
+        is_impossible_speed = ddf['speed_mph'] > MAX_SPEED_MPH
+        
+        is_teleporter = (
+            (ddf['trip_duration_minutes'] < MIN_TELEPORT_TIME_MINUTES) & 
+            (ddf['fare'] > MIN_TELEPORT_FARE)
+        )
+        
+        is_stationary = (ddf['trip_distance'] == 0) & (ddf['fare'] > MIN_STATIONARY_FARE)
+        
+        is_implausible_distance = ddf.map_partitions(
+            implausible_distance_mask, meta=('is_implausible_distance', bool)
+        )
+        
+        is_ghost = is_impossible_speed | is_teleporter | is_stationary | is_implausible_distance
+        
+        ddf['ghost_reason'] = 'Clean'
+        ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_stationary, 'Stationary Ride')
+        ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_implausible_distance, 'Implausible Distance')
+        ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_teleporter, 'Teleporter')
+        ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_impossible_speed, 'Impossible Speed')
     
-    is_ghost = is_impossible_speed | is_teleporter | is_stationary
+    return ddf, is_ghost
+
+
+def _scan_partition(df):
+    # Everything the first full pass needs, so raw files are read once
+    return {
+        'rows': np.int64(len(df)),
+        'ghost_count': np.int64((df['ghost_reason'] != 'Clean').sum()),
+        'quality': profile_partition(df),
+        'series': series_partition(df)
+    }
+
+
+def detect_ghost_trips(ddf, audit_name='ghost_trips.parquet', quality_name='data_quality.parquet',
+                       monitor=True):
+    print("\n🔍 Detecting ghost trips...")
     
-    ddf['ghost_reason'] = 'Clean'
-    ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_stationary, 'Stationary Ride')
-    ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_teleporter, 'Teleporter')
-    ddf['ghost_reason'] = ddf['ghost_reason'].where(~is_impossible_speed, 'Impossible Speed')
+    ddf, is_ghost = flag_ghost_trips(ddf)
     
     clean_ddf = ddf[~is_ghost]
     ghost_ddf = ddf[is_ghost]
     
-    print("   Computing statistics...")
-    ghost_count = is_ghost.sum().compute()
-    total_count = len(ddf)
+    print("   Computing statistics and data-quality profile...")
+    scan = reduce_partitions(ddf, _scan_partition)
+    ghost_count = int(scan['ghost_count'])
+    total_count = int(scan['rows'])
+    
+    save_quality_report(scan['quality'], quality_name)
+    if monitor:
+        append_series(scan['series'])
     
     print(f"🚨 Found {ghost_count:,} ghost trips ({ghost_count/total_count*100:.2f}%)")
     
@@ -73,7 +250,7 @@ def detect_ghost_trips(ddf):
     
     os.makedirs(DATA_AUDIT, exist_ok=True)
     ghost_trips.to_parquet(
-        os.path.join(DATA_AUDIT, 'ghost_trips.parquet'),
+        os.path.join(DATA_AUDIT, audit_name),
         index=False
     )
     
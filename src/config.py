@@ -3,7 +3,17 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_RAW = os.path.join(BASE_DIR, 'data', 'raw')
 DATA_PROCESSED = os.path.join(BASE_DIR, 'data', 'processed')
 DATA_AUDIT = os.path.join(BASE_DIR, 'data', 'audit')
+DATA_TIMESERIES = os.path.join(DATA_PROCESSED, 'timeseries')
+DATA_REFERENCE = os.path.join(BASE_DIR, 'data', 'reference')
+ZONE_SHAPEFILE = os.path.join(DATA_RAW, 'taxi_zones', 'taxi_zones.shp')
+ZONE_CENTROIDS_FILE = os.path.join(DATA_REFERENCE, 'taxi_zone_centroids.csv')
+ZONE_DISTANCES_FILE = os.path.join(DATA_REFERENCE, 'zone_distances.npz')
+ZONE_GEOJSON_FILE = os.path.join(DATA_REFERENCE, 'taxi_zones_simplified.geojson')
+ZONE_SHAPEFILE_URL = 'https://d37ci6vzurychx.cloudfront.net/misc/taxi_zones.zip'
+PIPELINE_STATUS_FILE = os.path.join(DATA_PROCESSED, 'pipeline_status.json')
+PIPELINE_CANCEL_FILE = os.path.join(DATA_PROCESSED, 'pipeline.cancel')
 OUTPUT_FIGURES = os.path.join(BASE_DIR, 'outputs', 'figures')
+PREVIEW_FIGURES = os.path.join(OUTPUT_FIGURES, 'preview')
 
 CONGESTION_ZONE_IDS = [
     4, 12, 13, 24, 41, 42, 43, 45, 48, 50, 68, 74, 75, 79, 87, 88, 90,
@@ -18,10 +28,37 @@ BORDER_ZONE_IDS = [
 ]
 
 CONGESTION_START_DATE = '2025-01-05'
+SURCHARGE_PER_TRIP = 2.50  # expected toll per zone-entering trip
+# [start, end) the full run reads besides the comparison windows; the event
+# study, OD matrices, sketches and revenue all cover it
+ANALYSIS_PERIOD = ('2024-01-01', '2026-01-01')
+# Baseline/treatment periods are [start, end); the first window drives the figures
+COMPARISON_WINDOWS = [
+    {
+        'name': 'Q1',
+        'baseline': ('2024-01-01', '2024-04-01'),
+        'treatment': ('2025-01-01', '2025-04-01')
+    }
+]
+ROLLING_WINDOWS = {
+    'start': CONGESTION_START_DATE,
+    'end': '2026-01-01',
+    'length_days': 28,
+    'step_days': 28,
+    'offset_days': 364
+}
+
+SAMPLE_FRACTION = 0.02
+SAMPLE_SEED = 42
+SAMPLE_CONFIDENCE_Z = 1.96
+DTYPE_BACKEND = None  # 'pyarrow' switches loading and flagging to Arrow kernels
 MAX_SPEED_MPH = 65
 MIN_TELEPORT_TIME_MINUTES = 1
 MIN_TELEPORT_FARE = 20
 MIN_STATIONARY_FARE = 0
+MIN_DISTANCE_RATIO = 0.8  # reported miles vs closest straight-line gap between the two zones
+MAX_DISTANCE_RATIO = 4.0  # reported miles vs centroid-to-centroid miles
+DISTANCE_SLACK_MILES = 5.0
 
 WEATHER_API_URL = "https://archive-api.open-meteo.com/v1/archive"
 WEATHER_PARAMS = {
@@ -55,4 +92,68 @@ GREEN_SCHEMA = {
     'total_amount': 'total_amount',
     'tip_amount': 'tip_amount',
     'congestion_surcharge': 'congestion_surcharge'
-}
\ No newline at end of file
+}
+
+# Arrow types of the canonical columns, used to fill columns a raw file lacks
+SCHEMA_TYPES = {
+    'pickup_time': 'timestamp[us]',
+    'dropoff_time': 'timestamp[us]',
+    'pickup_loc': 'int32',
+    'dropoff_loc': 'int32',
+    'trip_distance': 'double',
+    'fare': 'double',
+    'total_amount': 'double',
+    'tip_amount': 'double',
+    'congestion_surcharge': 'double'
+}
+
+SKETCH_YEARS = [2024, 2025]
+SKETCH_ZONE_CLASSES = ['inside', 'entering', 'outside']
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_QUANTILES = [0.5, 0.9, 0.99]
+SKETCH_METRICS = {
+    'speed_mph': (0.1, 100),
+    'trip_duration_minutes': (0.1, 600),
+    'fare': (0.5, 1000),
+    'tip_pct': (0.1, 100)
+}
+
+N_LOCATIONS = 266
+DATA_OD = os.path.join(DATA_PROCESSED, 'od_matrices')
+
+# Plausible [low, high) bounds used by the data-quality profile
+QUALITY_RANGES = {
+    'pickup_loc': (1, 266),
+    'dropoff_loc': (1, 266),
+    'trip_distance': (0, 200),
+    'fare': (0, 1000),
+    'total_amount': (0, 1500),
+    'tip_amount': (0, 500),
+    'congestion_surcharge': (0, 5)
+}
+
+EVENT_STUDY_START = '2024-01-01'
+EVENT_STUDY_DAYS = 731
+BOOTSTRAP_REPLICATES = 5000
+BOOTSTRAP_BLOCK_DAYS = 7
+BOOTSTRAP_WORKERS = None  # None uses every CPU
+
+MONITOR_WINDOW_DAYS = 28
+MONITOR_Z_THRESHOLD = 4.0
+MONITOR_MIN_TRIPS = 100
+
+FARE_HOUR_BUCKETS = [0, 6, 10, 16, 20, 24]  # overnight, AM peak, midday, PM peak, evening
+FARE_Z_THRESHOLD = 6.0
+FARE_MIN_OD_TRIPS = 30
+FARE_MIN_MAD = 1.0  # dollars; flat-fare routes would otherwise have a zero MAD
+FARE_STATS_SPLITS = 16
+
+MAP_SIMPLIFY_TOLERANCE = 0.0002  # degrees (~20 m) for the dashboard zone outlines
+MAP_COORD_DECIMALS = 5
+
+API_HOST = '127.0.0.1'
+API_PORT = 8765
+API_CACHE_SIZE = 256
+
+PROGRESS_PRINT_SECONDS = 10  # console progress line interval during long computes
+PROGRESS_STATUS_SECONDS = 1  # status feed refresh interval
@@ -1,11 +1,17 @@
 import dask.dataframe as dd
+import pyarrow.parquet as pq
+import pyarrow as pa
+import numpy as np
 import os
+import re
 import glob
-from src.config import DATA_RAW, UNIFIED_SCHEMA, GREEN_SCHEMA
+from src.config import DATA_RAW, UNIFIED_SCHEMA, GREEN_SCHEMA, SCHEMA_TYPES
 import pandas as pd
 
+FILE_PATTERN = re.compile(r'(yellow|green)_tripdata_(\d{4})-(\d{2})\.parquet$')
 
-def load_taxi_data(taxi_type='yellow', year=2025, month=None):
+
+def load_taxi_data(taxi_type='yellow', year=2025, month=None, dtype_backend=None):
     if month:
         pattern = os.path.join(DATA_RAW, f'{taxi_type}_tripdata_{year}-{month:02d}.parquet')
     else:
@@ -19,17 +25,77 @@ def load_taxi_data(taxi_type='yellow', year=2025, month=None):
     
     print(f"📂 Loading {len(files)} files for {taxi_type} taxi {year}")
     
-    ddf = dd.read_parquet(files, engine='pyarrow')
+    # Files are read one at a time so each row keeps its source file and
+    # schema drift between months only affects that month's columns
+    kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+    ddfs = [
+        apply_schema(
+            dd.read_parquet(path, engine='pyarrow', **kwargs),
+            taxi_type,
+            source_file=os.path.basename(path),
+            dtype_backend=dtype_backend
+        )
+        for path in files
+    ]
+    
+    return dd.concat(ddfs, axis=0, ignore_unknown_divisions=True)
+
+
+def load_files(files, dtype_backend=None):
+    kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+    ddfs = []
+    for path in files:
+        taxi_type = 'green' if os.path.basename(path).startswith('green') else 'yellow'
+        ddf = dd.read_parquet(path, engine='pyarrow', **kwargs)
+        ddfs.append(apply_schema(ddf, taxi_type, source_file=os.path.basename(path),
+                                 dtype_backend=dtype_backend))
+    
+    if not ddfs:
+        return None
     
+    return dd.concat(ddfs, axis=0, ignore_unknown_divisions=True)
+
+
+def read_row_group(part, dtype_backend=None):
+    # part: {'path', 'row_group', 'taxi_type'}; used by planned and sampled reads
+    table = pq.ParquetFile(part['path']).read_row_group(part['row_group'])
+    if dtype_backend == 'pyarrow':
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    else:
+        df = table.to_pandas()
+    
+    return apply_schema(df, part['taxi_type'], source_file=os.path.basename(part['path']),
+                        dtype_backend=dtype_backend)
+
+
+def missing_column_dtype(column, dtype_backend=None):
+    arrow_type = pa.type_for_alias(SCHEMA_TYPES[column])
+    if dtype_backend == 'pyarrow':
+        return pd.ArrowDtype(arrow_type)
+    # Same as pyarrow's own conversion of an all-null integer column
+    return np.float64 if pa.types.is_integer(arrow_type) else arrow_type.to_pandas_dtype()
+
+
+def apply_schema(df, taxi_type, source_file=None, dtype_backend=None):
     schema = GREEN_SCHEMA if taxi_type == 'green' else UNIFIED_SCHEMA
     column_mapping = {v: k for k, v in schema.items()}
     
-    existing_cols = [col for col in schema.values() if col in ddf.columns]
-    ddf = ddf[existing_cols]
-    ddf = ddf.rename(columns=column_mapping)
-    ddf['taxi_type'] = taxi_type
-    
-    return ddf
+    existing_cols = [col for col in schema.values() if col in df.columns]
+    df = df[existing_cols]
+    df = df.rename(columns=column_mapping)
+    
+    # Every file and row group comes out with the full schema, so planned
+    # reads (one partition per row group) all match the collection's meta
+    for column in schema:
+        if column not in df.columns:
+            df[column] = np.nan
+            df[column] = df[column].astype(missing_column_dtype(column, dtype_backend))
+    df = df[list(schema)]
+    df['taxi_type'] = taxi_type
+    if source_file:
+        df['source_file'] = source_file
+    
+    return df
 
 
 def check_december_2025():
@@ -50,20 +116,20 @@ def check_december_2025():
     return True
 
 
-def load_all_data():
+def load_all_data(dtype_backend=None):
     dfs = []
     
     # Load 2024 data
     for taxi_type in ['yellow', 'green']:
         print(f"\n🚕 Loading {taxi_type} taxi 2024 data...")
-        ddf_2024 = load_taxi_data(taxi_type, 2024)
+        ddf_2024 = load_taxi_data(taxi_type, 2024, dtype_backend=dtype_backend)
         if ddf_2024 is not None:
             dfs.append(ddf_2024)
     
     # Load 2025 data
     for taxi_type in ['yellow', 'green']:
         print(f"\n🚕 Loading {taxi_type} taxi 2025 data...")
-        ddf_2025 = load_taxi_data(taxi_type, 2025)
+        ddf_2025 = load_taxi_data(taxi_type, 2025, dtype_backend=dtype_backend)
         if ddf_2025 is not None:
             dfs.append(ddf_2025)
     
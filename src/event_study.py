@@ -0,0 +1,195 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import os
+from src.config import (
+    CONGESTION_ZONE_IDS,
+    CONGESTION_START_DATE,
+    N_LOCATIONS,
+    EVENT_STUDY_START,
+    EVENT_STUDY_DAYS,
+    BOOTSTRAP_REPLICATES,
+    BOOTSTRAP_BLOCK_DAYS,
+    BOOTSTRAP_WORKERS,
+    DATA_PROCESSED
+)
+from src.partials import reduce_partitions
+from src.sampling import expansion_weights, weighted_bincount
+
+TAXI_TYPES = ['yellow', 'green']
+DATES = pd.date_range(EVENT_STUDY_START, periods=EVENT_STUDY_DAYS, freq='D')
+
+# (treated, control) groups; each is a set of (taxi types, pickup locations)
+ALL_LOCATIONS = list(range(N_LOCATIONS))
+NON_ZONE_IDS = [loc for loc in ALL_LOCATIONS if loc not in set(CONGESTION_ZONE_IDS)]
+COMPARISONS = {
+    'zone_vs_non_zone': ((TAXI_TYPES, CONGESTION_ZONE_IDS), (TAXI_TYPES, NON_ZONE_IDS)),
+    'yellow_vs_green': ((['yellow'], CONGESTION_ZONE_IDS), (['green'], CONGESTION_ZONE_IDS))
+}
+
+
+def daily_partition(df):
+    counts = np.zeros((EVENT_STUDY_DAYS, len(TAXI_TYPES), N_LOCATIONS), dtype=np.int64)
+    if len(df) == 0:
+        return counts
+
+    pickup = df['pickup_time'].to_numpy(dtype='datetime64[D]', na_value=np.datetime64('NaT'))
+    day = (pickup - np.datetime64(EVENT_STUDY_START, 'D')).astype(np.int64)
+    taxi = (df['taxi_type'] == 'green').to_numpy(dtype=np.int64)
+    loc = df['pickup_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+
+    valid = (
+        ~np.isnat(pickup) & (day >= 0) & (day < EVENT_STUDY_DAYS) &
+        (loc >= 0) & (loc < N_LOCATIONS)
+    )
+    flat = (day * len(TAXI_TYPES) + taxi) * N_LOCATIONS + loc
+    return weighted_bincount(flat, valid, expansion_weights(df), counts.size).reshape(counts.shape)
+
+
+def build_daily_aggregates(ddf):
+    print("   Aggregating daily trips by taxi type and pickup zone...")
+
+    try:
+        daily = reduce_partitions(ddf, daily_partition)
+        print(f"   ✅ Daily aggregates: {int((daily.sum(axis=(1, 2)) > 0).sum())} days with trips")
+        return daily
+
+    except Exception as e:
+        print(f"   ⚠️  Error building daily aggregates: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def save_daily_aggregates(daily, name='daily_zone_trips.parquet'):
+    day, taxi, loc = np.nonzero(daily)
+    long_df = pd.DataFrame({
+        'date': DATES[day],
+        'taxi_type': np.asarray(TAXI_TYPES)[taxi],
+        'pickup_loc': loc,
+        'trips': daily[day, taxi, loc]
+    })
+    long_df.to_parquet(os.path.join(DATA_PROCESSED, name), index=False)
+
+
+def _group_series(daily, group):
+    taxi_types, locations = group
+    taxi_idx = [TAXI_TYPES.index(t) for t in taxi_types]
+    return daily[:, taxi_idx][:, :, locations].sum(axis=(1, 2))
+
+
+def gap_series(daily, comparison):
+    # Daily log-gap between treated and control; days missing either side are dropped
+    treated, control = COMPARISONS[comparison]
+    y_treated = _group_series(daily, treated)
+    y_control = _group_series(daily, control)
+
+    observed = (y_treated > 0) & (y_control > 0)
+    gap = np.log(y_treated[observed]) - np.log(y_control[observed])
+    return pd.Series(gap, index=DATES[observed], name=comparison)
+
+
+def _block_means(values, n_boot, block, rng):
+    # Moving-block bootstrap of the mean, all replicates at once
+    n = len(values)
+    block = min(block, n)
+    n_blocks = int(np.ceil(n / block))
+    starts = rng.integers(0, n - block + 1, size=(n_boot, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_boot, -1)[:, :n]
+    return values[idx].mean(axis=1)
+
+
+def _bootstrap_chunk(args):
+    pre, post, weeks, n_boot, block, seed = args
+    rng = np.random.default_rng(seed)
+
+    pre_means = _block_means(pre, n_boot, block, rng)
+    did = _block_means(post, n_boot, block, rng) - pre_means
+
+    # Event weeks: resample days inside each week against the resampled baseline
+    week_effects = np.empty((n_boot, len(weeks)))
+    for j, week in enumerate(weeks):
+        idx = rng.integers(0, len(week), size=(n_boot, len(week)))
+        week_effects[:, j] = week[idx].mean(axis=1) - pre_means
+
+    return did, week_effects
+
+
+def parallel_bootstrap(pre, post, weeks, n_boot=BOOTSTRAP_REPLICATES,
+                       block=BOOTSTRAP_BLOCK_DAYS, workers=BOOTSTRAP_WORKERS, seed=42):
+    workers = workers or os.cpu_count() or 1
+    sizes = [len(c) for c in np.array_split(np.arange(n_boot), workers) if len(c)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(pre, post, weeks, size, block, s) for size, s in zip(sizes, seeds)]
+
+    if len(tasks) == 1:
+        results = [_bootstrap_chunk(tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            results = list(pool.map(_bootstrap_chunk, tasks))
+
+    return (
+        np.concatenate([r[0] for r in results]),
+        np.concatenate([r[1] for r in results])
+    )
+
+
+def run_event_study(daily, comparison, n_boot=BOOTSTRAP_REPLICATES):
+    gap = gap_series(daily, comparison)
+    start = pd.Timestamp(CONGESTION_START_DATE)
+    pre = gap[gap.index < start]
+    post = gap[gap.index >= start]
+
+    if len(pre) < BOOTSTRAP_BLOCK_DAYS or len(post) < BOOTSTRAP_BLOCK_DAYS:
+        print(f"   ⚠️  Not enough pre/post days for {comparison}")
+        return None, pd.DataFrame()
+
+    event_week = ((post.index - start).days // 7).to_numpy()
+    week_ids = np.unique(event_week)
+    weeks = [post.to_numpy()[event_week == w] for w in week_ids]
+
+    did = post.mean() - pre.mean()
+    week_effects = np.array([w.mean() for w in weeks]) - pre.mean()
+
+    boot_did, boot_weeks = parallel_bootstrap(pre.to_numpy(), post.to_numpy(), weeks, n_boot)
+    ci_low, ci_high = np.percentile(boot_did, [2.5, 97.5])
+
+    estimate = {
+        'comparison': comparison,
+        'did_log': did,
+        'did_pct': np.expm1(did) * 100,
+        'ci_low_pct': np.expm1(ci_low) * 100,
+        'ci_high_pct': np.expm1(ci_high) * 100,
+        'pre_days': len(pre),
+        'post_days': len(post),
+        'replicates': len(boot_did)
+    }
+
+    week_lo, week_hi = np.percentile(boot_weeks, [2.5, 97.5], axis=0)
+    event_df = pd.DataFrame({
+        'comparison': comparison,
+        'event_week': week_ids,
+        'effect_pct': np.expm1(week_effects) * 100,
+        'ci_low_pct': np.expm1(week_lo) * 100,
+        'ci_high_pct': np.expm1(week_hi) * 100
+    })
+
+    return estimate, event_df
+
+
+def run_all_event_studies(daily, n_boot=BOOTSTRAP_REPLICATES):
+    estimates = []
+    events = []
+    for comparison in COMPARISONS:
+        print(f"   Bootstrapping {comparison} ({n_boot:,} replicates)...")
+        estimate, event_df = run_event_study(daily, comparison, n_boot)
+        if estimate is None:
+            continue
+        print(f"   ✅ {comparison}: {estimate['did_pct']:+.2f}% "
+              f"[{estimate['ci_low_pct']:+.2f}%, {estimate['ci_high_pct']:+.2f}%]")
+        estimates.append(estimate)
+        events.append(event_df)
+
+    estimates_df = pd.DataFrame(estimates)
+    events_df = pd.concat(events, ignore_index=True) if events else pd.DataFrame()
+    return estimates_df, events_df
@@ -0,0 +1,153 @@
+import dask
+from dask import delayed
+import pandas as pd
+import numpy as np
+import glob
+import os
+from src.config import (
+    N_LOCATIONS,
+    SKETCH_METRICS,
+    FARE_HOUR_BUCKETS,
+    FARE_Z_THRESHOLD,
+    FARE_MIN_OD_TRIPS,
+    FARE_MIN_MAD,
+    FARE_STATS_SPLITS,
+    DATA_AUDIT
+)
+from src.sketches import bin_index, bin_values
+
+FARE_LO, FARE_HI = SKETCH_METRICS['fare']
+FARE_BIN_VALUES = bin_values(FARE_LO, FARE_HI)
+N_HOUR_BUCKETS = len(FARE_HOUR_BUCKETS) - 1
+STATS_COLUMNS = ['od_bucket', 'od_trips', 'fare_median', 'fare_mad']
+
+
+def _od_bucket(df):
+    pickup = df['pickup_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+    dropoff = df['dropoff_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+    hour = df['pickup_time'].dt.hour.to_numpy(dtype=float, na_value=-1)
+    bucket = np.searchsorted(FARE_HOUR_BUCKETS, hour, side='right') - 1
+
+    valid = (
+        (pickup >= 0) & (pickup < N_LOCATIONS) & (dropoff >= 0) & (dropoff < N_LOCATIONS) &
+        (bucket >= 0) & (bucket < N_HOUR_BUCKETS)
+    )
+    code = (pickup * N_LOCATIONS + dropoff) * N_HOUR_BUCKETS + bucket
+    return np.where(valid, code, -1)
+
+
+def _histogram_partition(df, n_splits):
+    # Sparse fare sketch per (pickup, dropoff, hour bucket), pre-split by
+    # group hash so each split can be merged independently of the others
+    code = _od_bucket(df)
+    fare = df['fare'].to_numpy(dtype=float, na_value=np.nan)
+    valid = (code >= 0) & (fare > 0)
+
+    keys, counts = np.unique(
+        code[valid] * len(FARE_BIN_VALUES) + bin_index(fare[valid], FARE_LO, FARE_HI),
+        return_counts=True
+    )
+    hist = pd.DataFrame({
+        'od_bucket': keys // len(FARE_BIN_VALUES),
+        'bin': keys % len(FARE_BIN_VALUES),
+        'count': counts
+    })
+    split = hist['od_bucket'].to_numpy() % n_splits
+    return [hist[split == j] for j in range(n_splits)]
+
+
+def _weighted_median(groups, values, weights):
+    # Lower weighted median of values within each group (groups sorted)
+    order = np.lexsort((values, groups))
+    groups, values, weights = groups[order], values[order], weights[order]
+    cum = np.cumsum(weights)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    totals = np.add.reduceat(weights, starts)
+    before = np.r_[0, cum[starts[1:] - 1]]
+
+    owner = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(groups)]))
+    reached = (cum - before[owner]) * 2 >= totals[owner]
+    first = np.minimum.reduceat(np.where(reached, np.arange(len(groups)), len(groups)), starts)
+    return groups[starts], values[first], totals
+
+
+def _split_stats(*parts):
+    hist = pd.concat(parts, ignore_index=True)
+    if hist.empty:
+        return pd.DataFrame({c: pd.Series(dtype='float64') for c in STATS_COLUMNS})
+
+    hist = hist.groupby(['od_bucket', 'bin'], as_index=False)['count'].sum()
+    groups = hist['od_bucket'].to_numpy()
+    values = FARE_BIN_VALUES[hist['bin'].to_numpy()]
+    weights = hist['count'].to_numpy()
+
+    od_bucket, median, totals = _weighted_median(groups, values, weights)
+    deviation = np.abs(values - median[np.searchsorted(od_bucket, groups)])
+    _, mad, _ = _weighted_median(groups, deviation, weights)
+
+    return pd.DataFrame({
+        'od_bucket': od_bucket,
+        'od_trips': totals,
+        'fare_median': median,
+        'fare_mad': mad
+    })
+
+
+def _flag_partition(df, stats, out_dir, index):
+    if len(df) == 0:
+        return 0
+
+    # Broadcast join: the per-group stats table is small and shared by every partition
+    row_stats = stats.set_index('od_bucket').reindex(_od_bucket(df))
+    fare = df['fare'].to_numpy(dtype=float, na_value=np.nan)
+    median = row_stats['fare_median'].to_numpy()
+    mad = np.maximum(row_stats['fare_mad'].to_numpy(), FARE_MIN_MAD)
+    z = (fare - median) / (1.4826 * mad)
+
+    with np.errstate(invalid='ignore'):
+        flagged = (
+            (row_stats['od_trips'].to_numpy() >= FARE_MIN_OD_TRIPS) &
+            (np.abs(z) > FARE_Z_THRESHOLD)
+        )
+    if not flagged.any():
+        return 0
+
+    anomalies = df[flagged].copy()
+    anomalies['od_trips'] = row_stats['od_trips'].to_numpy()[flagged]
+    anomalies['fare_median'] = median[flagged]
+    anomalies['fare_mad'] = mad[flagged]
+    anomalies['fare_robust_z'] = z[flagged]
+    anomalies.to_parquet(os.path.join(out_dir, f'part.{index}.parquet'), index=False)
+    return int(flagged.sum())
+
+
+def detect_fare_anomalies(ddf, audit_name='fare_anomalies', n_splits=FARE_STATS_SPLITS):
+    print("\n💸 Detecting per-route fare anomalies...")
+
+    try:
+        out_dir = os.path.join(DATA_AUDIT, audit_name)
+        os.makedirs(out_dir, exist_ok=True)
+        for old in glob.glob(os.path.join(out_dir, 'part.*.parquet')):
+            os.remove(old)
+
+        # Pass 1: per-partition sketches, merged per hash split into median/MAD
+        parts = ddf.to_delayed(optimize_graph=False)
+        hists = [delayed(_histogram_partition, nout=n_splits)(part, n_splits) for part in parts]
+        splits = [delayed(_split_stats)(*[h[j] for h in hists]) for j in range(n_splits)]
+        stats, = dask.persist(delayed(pd.concat)(splits, ignore_index=True))
+
+        # Pass 2: each partition joins the stats and writes its own flagged rows
+        counts = dask.compute(*[
+            delayed(_flag_partition)(part, stats, out_dir, i) for i, part in enumerate(parts)
+        ])
+        n_flagged = sum(counts)
+
+        print(f"   ✅ Flagged {n_flagged:,} fare outliers (|robust z| > {FARE_Z_THRESHOLD})")
+        print(f"💾 Fare anomalies saved: {audit_name}/")
+        return n_flagged
+
+    except Exception as e:
+        print(f"   ⚠️  Error detecting fare anomalies: {e}")
+        import traceback
+        traceback.print_exc()
+        return 0
@@ -0,0 +1,224 @@
+import pandas as pd
+import numpy as np
+import glob
+import json
+import os
+from src.config import (
+    CONGESTION_ZONE_IDS,
+    CONGESTION_START_DATE,
+    DATA_RAW,
+    DATA_AUDIT,
+    DATA_TIMESERIES,
+    MONITOR_WINDOW_DAYS,
+    MONITOR_Z_THRESHOLD,
+    MONITOR_MIN_TRIPS
+)
+from src.paths import file_month
+
+SERIES_COLUMNS = ['trips', 'ghost_trips', 'entering', 'entering_with_surcharge']
+MONITOR_METRICS = ['compliance_rate', 'ghost_rate', 'leakage_trips']
+STATE_FILE = 'detector_state.json'
+
+
+def series_partition(df):
+    # Hourly counts per source file on that file's own month grid, so files
+    # from any year get a series; out-of-month pickups are left to the
+    # data-quality profile
+    result = {}
+    if len(df) == 0 or 'source_file' not in df.columns:
+        return result
+
+    pickup = df['pickup_time'].to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT'))
+    pickup_hour = pickup.astype('datetime64[h]')
+
+    is_ghost = (df['ghost_reason'] != 'Clean').to_numpy(dtype=bool, na_value=False)
+    starts = np.isin(df['pickup_loc'].to_numpy(dtype=float, na_value=-1), CONGESTION_ZONE_IDS)
+    ends = np.isin(df['dropoff_loc'].to_numpy(dtype=float, na_value=-1), CONGESTION_ZONE_IDS)
+    after_start = pickup >= np.datetime64(CONGESTION_START_DATE)
+    surcharge = df['congestion_surcharge'].to_numpy(dtype=float, na_value=0) > 0
+
+    entering = ~starts & ends & ~is_ghost & after_start
+    flags = [np.ones(len(df), dtype=bool), is_ghost, entering, entering & surcharge]
+
+    sources = df['source_file'].astype(str).to_numpy()
+    for source_file in pd.unique(sources):
+        month = file_month(source_file)
+        if month is None:
+            continue
+
+        n_hours = int((month[1] - month[0]) / pd.Timedelta(hours=1))
+        hour = (pickup_hour - np.datetime64(month[0], 'h')).astype(np.int64)
+        rows = (sources == source_file) & ~np.isnat(pickup) & (hour >= 0) & (hour < n_hours)
+        result[str(source_file)] = np.stack([
+            np.bincount(hour[rows & flag], minlength=n_hours) for flag in flags
+        ])
+
+    return result
+
+
+def _series_path(source_file):
+    stem = os.path.splitext(os.path.basename(source_file))[0]
+    return os.path.join(DATA_TIMESERIES, f'series_{stem}.parquet')
+
+
+def stored_source_files():
+    paths = glob.glob(os.path.join(DATA_TIMESERIES, 'series_*.parquet'))
+    return {os.path.basename(p)[len('series_'):-len('.parquet')] + '.parquet' for p in paths}
+
+
+def pending_raw_files():
+    stored = stored_source_files()
+    return [
+        path for path in sorted(glob.glob(os.path.join(DATA_RAW, '*_tripdata_*.parquet')))
+        if os.path.basename(path) not in stored
+    ]
+
+
+def append_series(series):
+    # Append-only: files that already have a stored series are never rewritten
+    os.makedirs(DATA_TIMESERIES, exist_ok=True)
+    written = 0
+
+    for source_file, counts in series.items():
+        path = _series_path(source_file)
+        if os.path.exists(path):
+            continue
+
+        hours = np.flatnonzero(counts[0])
+        if len(hours) == 0:
+            print(f"   ⚠️  {source_file} has no pickups inside its own month")
+        frame = pd.DataFrame({'hour': file_month(source_file)[0] + pd.to_timedelta(hours, unit='h')})
+        for i, column in enumerate(SERIES_COLUMNS):
+            frame[column] = counts[i, hours]
+        frame.to_parquet(path, index=False)
+        written += 1
+
+    print(f"📈 Monitoring series: {written} new files appended, "
+          f"{len(series) - written} already stored")
+    return written
+
+
+def load_series():
+    paths = sorted(glob.glob(os.path.join(DATA_TIMESERIES, 'series_*.parquet')))
+    if not paths:
+        return pd.DataFrame(columns=SERIES_COLUMNS)
+
+    frames = [pd.read_parquet(p) for p in paths]
+    return pd.concat(frames, ignore_index=True).groupby('hour')[SERIES_COLUMNS].sum()
+
+
+def add_rates(counts):
+    counts = counts.copy()
+    counts['ghost_rate'] = counts['ghost_trips'] / counts['trips'].replace(0, np.nan) * 100
+    counts['compliance_rate'] = (
+        counts['entering_with_surcharge'] / counts['entering'].where(counts['entering'] >= MONITOR_MIN_TRIPS) * 100
+    )
+    counts['leakage_trips'] = counts['entering'] - counts['entering_with_surcharge']
+    return counts
+
+
+def daily_series(hourly):
+    if hourly.empty:
+        return pd.DataFrame()
+    daily = hourly.resample('D').sum()
+    # Days with no data at all (missing months) are gaps, not zero-compliance days
+    return add_rates(daily[daily['trips'] > 0])
+
+
+def _load_state():
+    path = os.path.join(DATA_TIMESERIES, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(state):
+    os.makedirs(DATA_TIMESERIES, exist_ok=True)
+    with open(os.path.join(DATA_TIMESERIES, STATE_FILE), 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def _robust_z(values, window):
+    # Trailing median/MAD excluding the day being scored
+    history = values.shift(1).rolling(f'{window}D', min_periods=7)
+    median = history.median()
+    mad = history.apply(lambda w: np.median(np.abs(w - np.median(w))), raw=True)
+    return (values - median) / (1.4826 * mad.replace(0, np.nan)), median
+
+
+def _file_days(index, source_files):
+    # Days covered by the given raw files' months
+    days = pd.DatetimeIndex([])
+    for source_file in source_files:
+        month = file_month(source_file)
+        if month is not None:
+            days = days.union(index[(index >= month[0]) & (index < month[1])])
+    return days
+
+
+def detect_anomalies(daily, window=MONITOR_WINDOW_DAYS, threshold=MONITOR_Z_THRESHOLD):
+    # Incremental: every day covered by a series file appended since the last
+    # scoring is (re)scored, so a day whose green file lands after its yellow
+    # one is scored again with both. The stored trailing window is context.
+    if daily.empty:
+        return pd.DataFrame(), pd.DatetimeIndex([])
+
+    stored = stored_source_files()
+    scored = set(_load_state().get('scored_files', []))
+    new_days = _file_days(daily.index, sorted(stored - scored))
+
+    if len(new_days) == 0:
+        print("   No new days to score")
+        return pd.DataFrame(), new_days
+
+    context = daily[daily.index >= new_days[0] - pd.Timedelta(days=window)]
+    flagged = []
+    for metric in MONITOR_METRICS:
+        z, median = _robust_z(context[metric], window)
+        hits = z.index.isin(new_days) & (z.abs() > threshold).to_numpy()
+        for day in z.index[hits]:
+            flagged.append({
+                'date': day,
+                'metric': metric,
+                'value': context.at[day, metric],
+                'rolling_median': median[day],
+                'robust_z': z[day]
+            })
+
+    _save_state({'scored_files': sorted(stored)})
+    anomalies = pd.DataFrame(flagged)
+    print(f"   Scored {len(new_days)} new or updated days, flagged {len(anomalies)} anomalies")
+    return anomalies, new_days
+
+
+def append_anomalies(anomalies, scored_days, name='anomalies.parquet'):
+    # Earlier verdicts for rescored days are replaced, not duplicated
+    if len(scored_days) == 0:
+        return
+    path = os.path.join(DATA_AUDIT, name)
+    os.makedirs(DATA_AUDIT, exist_ok=True)
+    if os.path.exists(path):
+        previous = pd.read_parquet(path)
+        previous = previous[~pd.to_datetime(previous['date']).isin(scored_days)]
+        anomalies = pd.concat([previous, anomalies], ignore_index=True)
+    elif anomalies.empty:
+        return
+    anomalies.to_parquet(path, index=False)
+    print(f"🚨 Anomalies saved: {name}")
+
+
+def run_anomaly_detection():
+    print("\n🚨 Scoring daily compliance / ghost / leakage series...")
+
+    try:
+        daily = daily_series(load_series())
+        anomalies, scored_days = detect_anomalies(daily)
+        append_anomalies(anomalies, scored_days)
+        return anomalies
+
+    except Exception as e:
+        print(f"   ⚠️  Error detecting anomalies: {e}")
+        import traceback
+        traceback.print_exc()
+        return pd.DataFrame()
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import glob
+import os
+from src.config import CONGESTION_ZONE_IDS, CONGESTION_START_DATE, N_LOCATIONS, DATA_OD
+from src.partials import reduce_partitions, merge_partials
+from src.sampling import expansion_weights, weighted_bincount
+
+OD_LAYERS = ['trips', 'fare', 'surcharge', 'no_surcharge', 'distance', 'duration_hours']
+
+ZONE_MASK = np.zeros(N_LOCATIONS, dtype=bool)
+ZONE_MASK[CONGESTION_ZONE_IDS] = True
+
+# Months containing one of these dates are stored as two periods, e.g.
+# '2025-01' (Jan 1-4) and '2025-01-05', so toll metrics can start exactly on it
+OD_SPLIT_DATES = [pd.Timestamp(CONGESTION_START_DATE)]
+
+
+def od_partition(df):
+    result = {}
+    if len(df) == 0:
+        return result
+
+    pickup = df['pickup_loc'].to_numpy(dtype=float, na_value=-1)
+    dropoff = df['dropoff_loc'].to_numpy(dtype=float, na_value=-1)
+    year = df['pickup_time'].dt.year.to_numpy(dtype=float, na_value=0)
+    month = df['pickup_time'].dt.month.to_numpy(dtype=float, na_value=0)
+    day = df['pickup_time'].dt.day.to_numpy(dtype=float, na_value=0)
+    fare = np.nan_to_num(df['fare'].to_numpy(dtype=float, na_value=0))
+    surcharge = np.nan_to_num(df['congestion_surcharge'].to_numpy(dtype=float, na_value=0))
+    distance = np.nan_to_num(df['trip_distance'].to_numpy(dtype=float, na_value=0))
+    hours = (df['dropoff_time'] - df['pickup_time']).dt.total_seconds().to_numpy(dtype=float, na_value=0) / 3600
+    # Distance and time only count where both are usable, so their ratio is a speed
+    timed = (hours > 0) & (distance > 0)
+
+    valid = (
+        (pickup >= 0) & (pickup < N_LOCATIONS) &
+        (dropoff >= 0) & (dropoff < N_LOCATIONS) &
+        (year > 0)
+    )
+
+    # One integer per trip: pickup * N + dropoff
+    code = (pickup * N_LOCATIONS + dropoff).astype(np.int64)
+    first_day = np.ones(len(df))
+    for split in OD_SPLIT_DATES:
+        after = (year == split.year) & (month == split.month) & (day >= split.day)
+        first_day = np.where(after, split.day, first_day)
+    period = (year * 10000 + month * 100 + first_day).astype(np.int64)
+    size = N_LOCATIONS * N_LOCATIONS
+
+    weights = expansion_weights(df)
+
+    for p in np.unique(period[valid]):
+        rows = valid & (period == p)
+        layers = np.stack([
+            weighted_bincount(code, rows, weights, size),
+            weighted_bincount(code, rows, weights, size, values=fare),
+            weighted_bincount(code, rows, weights, size, values=surcharge),
+            weighted_bincount(code, rows & (surcharge <= 0), weights, size),
+            weighted_bincount(code, rows & timed, weights, size, values=distance),
+            weighted_bincount(code, rows & timed, weights, size, values=hours)
+        ])
+        y, m, d = p // 10000, p // 100 % 100, p % 100
+        key = f'{y}-{m:02d}' if d == 1 else f'{y}-{m:02d}-{d:02d}'
+        result[key] = layers.reshape(len(OD_LAYERS), N_LOCATIONS, N_LOCATIONS)
+
+    return result
+
+
+def build_od_matrices(ddf):
+    print("   Accumulating origin-destination matrices...")
+
+    try:
+        od = reduce_partitions(ddf, od_partition)
+        print(f"   ✅ Built OD matrices for {len(od)} months")
+        return od
+
+    except Exception as e:
+        print(f"   ⚠️  Error building OD matrices: {e}")
+        import traceback
+        traceback.print_exc()
+        return {}
+
+
+def save_od_matrices(od, out_dir=DATA_OD):
+    os.makedirs(out_dir, exist_ok=True)
+    for period, layers in od.items():
+        np.savez_compressed(
+            os.path.join(out_dir, f'od_{period}.npz'),
+            **{name: layers[i] for i, name in enumerate(OD_LAYERS)}
+        )
+    print(f"   💾 Saved {len(od)} monthly OD matrices to {out_dir}")
+
+
+def load_od_matrices(out_dir=DATA_OD):
+    od = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, 'od_*.npz'))):
+        period = os.path.basename(path)[3:-4]
+        with np.load(path) as data:
+            # Files written before a layer existed load it as zeros
+            od[period] = np.stack([
+                data[name] if name in data else np.zeros((N_LOCATIONS, N_LOCATIONS))
+                for name in OD_LAYERS
+            ])
+    return od
+
+
+def od_period_start(period):
+    # 'YYYY-MM' starts on the 1st; split periods carry their start day
+    return pd.Timestamp(period)
+
+
+def combine_od(od, year=None, months=None, start=None, end=None):
+    # start/end select periods by their first day, [start, end)
+    selected = [
+        layers for period, layers in od.items()
+        if (year is None or int(period[:4]) == year)
+        and (months is None or int(period[5:7]) in months)
+        and (start is None or od_period_start(period) >= pd.Timestamp(start))
+        and (end is None or od_period_start(period) < pd.Timestamp(end))
+    ]
+    if not selected:
+        return np.zeros((len(OD_LAYERS), N_LOCATIONS, N_LOCATIONS))
+    return merge_partials(*selected)
+
+
+def od_layer(layers, name):
+    return layers[OD_LAYERS.index(name)]
+
+
+def od_zone_entries(layers, name='trips'):
+    # Per pickup zone outside the congestion zone, summed over zone dropoffs
+    return np.where(~ZONE_MASK, od_layer(layers, name)[:, ZONE_MASK].sum(axis=1), 0)
+
+
+def od_leakage_corridors(layers, top_n=10):
+    no_surcharge = od_layer(layers, 'no_surcharge')
+    trips = od_layer(layers, 'trips')
+
+    entering = np.outer(~ZONE_MASK, ZONE_MASK)
+    leaks = np.where(entering, no_surcharge, 0)
+
+    flat = np.argsort(leaks, axis=None)[::-1][:top_n]
+    pickup, dropoff = np.unravel_index(flat, leaks.shape)
+
+    corridors = pd.DataFrame({
+        'pickup_loc': pickup,
+        'dropoff_loc': dropoff,
+        'missing_surcharge': leaks[pickup, dropoff].astype(int),
+        'trips': trips[pickup, dropoff].astype(int)
+    })
+    corridors = corridors[corridors['missing_surcharge'] > 0]
+    corridors['leakage_rate'] = corridors['missing_surcharge'] / corridors['trips'] * 100
+    return corridors.reset_index(drop=True)
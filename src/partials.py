@@ -0,0 +1,42 @@
+from dask import delayed
+import numpy as np
+
+
+def merge_partials(*partials):
+    first = partials[0]
+    if isinstance(first, dict):
+        # Keys may differ between partials (e.g. months present in a partition)
+        keys = dict.fromkeys(key for p in partials for key in p)
+        merged = {}
+        for key in keys:
+            values = [p[key] for p in partials if key in p]
+            # Extremes merge by min/max; everything else is an additive count or sum
+            if key == 'min':
+                merged[key] = np.min(values, axis=0)
+            elif key == 'max':
+                merged[key] = np.max(values, axis=0)
+            else:
+                merged[key] = merge_partials(*values)
+        return merged
+    return np.sum(partials, axis=0)
+
+
+def partition_reduction(ddf, chunk_fn, split_every=8):
+    # Each partition is reduced to a small array (or dict of arrays) and the
+    # partials are merged in a tree, so no raw rows reach the driver.
+    # Returned lazily so it can share a scan with other computations.
+    # Expression optimisation is skipped: on the long column-assignment
+    # chains built by the cleaners it costs far more than the scan itself.
+    parts = [delayed(chunk_fn)(part) for part in ddf.to_delayed(optimize_graph=False)]
+    
+    while len(parts) > 1:
+        parts = [
+            delayed(merge_partials)(*parts[i:i + split_every])
+            for i in range(0, len(parts), split_every)
+        ]
+    
+    return parts[0]
+
+
+def reduce_partitions(ddf, chunk_fn, split_every=8):
+    return partition_reduction(ddf, chunk_fn, split_every).compute()
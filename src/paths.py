@@ -0,0 +1,15 @@
+import pandas as pd
+import re
+
+# Raw-file name helpers with no Dask import, so the dashboard can use the
+# modules that need them without paying for dask.dataframe at startup
+MONTH_PATTERN = re.compile(r'(\d{4})-(\d{2})\.parquet$')
+
+
+def file_month(source_file):
+    # [start, end) of the month a raw file covers, from its name
+    match = MONTH_PATTERN.search(str(source_file))
+    if not match:
+        return None
+    start = pd.Timestamp(year=int(match.group(1)), month=int(match.group(2)), day=1)
+    return start, start + pd.offsets.MonthBegin(1)
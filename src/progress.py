@@ -0,0 +1,201 @@
+from dask.callbacks import Callback
+from dask.sizeof import sizeof
+from datetime import datetime
+import signal
+import time
+import json
+import os
+from src.config import (
+    PIPELINE_STATUS_FILE,
+    PIPELINE_CANCEL_FILE,
+    PROGRESS_PRINT_SECONDS,
+    PROGRESS_STATUS_SECONDS
+)
+
+_TRACKER = None
+
+
+class PipelineCancelled(BaseException):
+    # BaseException so the per-stage `except Exception` fallbacks don't
+    # swallow it and carry on writing empty outputs over finished ones
+    pass
+
+
+def _fmt_bytes(n):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024:
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
+
+
+def _fmt_seconds(seconds):
+    if seconds is None:
+        return '?'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class ProgressTracker(Callback):
+    # Local-scheduler callbacks run on the scheduler thread, so no locking
+    def __init__(self, status_file=PIPELINE_STATUS_FILE, cancel_file=PIPELINE_CANCEL_FILE):
+        super().__init__()
+        self.status_file = status_file
+        self.cancel_file = cancel_file
+        self.run_started = time.time()
+        self.stage_name = 'startup'
+        self.stage_started = self.run_started
+        self.completed_stages = []
+        self.cancel_requested = False
+        self.state = 'running'
+        self.compute = None
+        self._last_print = self._last_status = self._last_cancel_check = 0.0
+
+    def set_stage(self, name):
+        self.check_cancel(force=True)
+        now = time.time()
+        if self.stage_name != 'startup':
+            self.completed_stages.append({'stage': self.stage_name, 'seconds': round(now - self.stage_started, 2)})
+        self.stage_name = name
+        self.stage_started = now
+        self.write_status()
+
+    def check_cancel(self, force=False):
+        now = time.time()
+        if not self.cancel_requested and (force or now - self._last_cancel_check >= 0.5):
+            self._last_cancel_check = now
+            self.cancel_requested = os.path.exists(self.cancel_file)
+        if self.cancel_requested:
+            raise PipelineCancelled(self.stage_name)
+
+    def _compute_stats(self):
+        c = self.compute
+        elapsed = time.time() - c['started']
+        eta = elapsed / c['done'] * (c['total'] - c['done']) if c['done'] else None
+        return {
+            'tasks_done': c['done'],
+            'tasks_total': c['total'],
+            'bytes': c['bytes'],
+            'throughput_bytes_per_s': c['bytes'] / elapsed if elapsed > 0 else 0.0,
+            'elapsed_seconds': round(elapsed, 2),
+            'eta_seconds': round(eta, 1) if eta is not None else None
+        }
+
+    def write_status(self):
+        status = {
+            'state': self.state,
+            'stage': self.stage_name,
+            'stage_started': datetime.fromtimestamp(self.stage_started).isoformat(timespec='seconds'),
+            'run_started': datetime.fromtimestamp(self.run_started).isoformat(timespec='seconds'),
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+            'completed_stages': self.completed_stages,
+            'cancel_requested': self.cancel_requested,
+            'compute': self._compute_stats() if self.compute else None
+        }
+        os.makedirs(os.path.dirname(self.status_file), exist_ok=True)
+        # Write-then-rename so readers never see a half-written file
+        tmp = self.status_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(status, f, indent=2)
+        os.replace(tmp, self.status_file)
+        self._last_status = time.time()
+
+    def _print_progress(self, final=False):
+        s = self._compute_stats()
+        pct = s['tasks_done'] / s['tasks_total'] * 100 if s['tasks_total'] else 100.0
+        timing = f"done in {_fmt_seconds(s['elapsed_seconds'])}" if final else f"ETA {_fmt_seconds(s['eta_seconds'])}"
+        print(f"   {'✅' if final else '⏳'} [{self.stage_name}] {s['tasks_done']:,}/{s['tasks_total']:,} tasks "
+              f"({pct:.0f}%) | {_fmt_bytes(s['bytes'])} at {_fmt_bytes(s['throughput_bytes_per_s'])}/s | {timing}")
+        self._last_print = time.time()
+
+    def _start_state(self, dsk, state):
+        total = sum(len(state[k]) for k in ['ready', 'waiting', 'running', 'finished'])
+        self.compute = {'started': time.time(), 'done': 0, 'total': total, 'bytes': 0}
+        self._last_print = time.time()
+        self.write_status()
+
+    def _pretask(self, key, dsk, state):
+        self.check_cancel()
+
+    def _posttask(self, key, result, dsk, state, worker_id):
+        if self.compute is None:
+            return
+        self.compute['done'] += 1
+        self.compute['bytes'] += sizeof(result)
+
+        now = time.time()
+        if now - self._last_status >= PROGRESS_STATUS_SECONDS:
+            self.write_status()
+        if now - self._last_print >= PROGRESS_PRINT_SECONDS:
+            self._print_progress()
+
+    def _finish(self, dsk, state, errored):
+        if self.compute is None:
+            return
+        if not errored and time.time() - self.compute['started'] >= 2:
+            self._print_progress(final=True)
+        self.compute = None
+        self.write_status()
+
+
+def stage(name):
+    # Marks a stage boundary; a no-op unless a tracked run is active
+    if _TRACKER is not None:
+        _TRACKER.set_stage(name)
+
+
+def request_cancel(cancel_file=PIPELINE_CANCEL_FILE):
+    os.makedirs(os.path.dirname(cancel_file), exist_ok=True)
+    with open(cancel_file, 'w') as f:
+        f.write(datetime.now().isoformat(timespec='seconds'))
+    print(f"🛑 Cancellation requested; the run stops before its next task")
+
+
+def tracked_run(fn, *args, **kwargs):
+    global _TRACKER
+    if os.path.exists(PIPELINE_CANCEL_FILE):
+        os.remove(PIPELINE_CANCEL_FILE)
+
+    tracker = ProgressTracker()
+    _TRACKER = tracker
+
+    # First Ctrl-C cancels gracefully; a second one interrupts immediately.
+    # Forked bootstrap workers inherit the handler and just stop.
+    pid = os.getpid()
+
+    def on_interrupt(signum, frame):
+        if tracker.cancel_requested or os.getpid() != pid:
+            raise KeyboardInterrupt
+        print("\n🛑 Cancelling after the running tasks finish (Ctrl-C again to abort)...")
+        tracker.cancel_requested = True
+
+    previous_handler = signal.signal(signal.SIGINT, on_interrupt)
+    tracker.register()
+    tracker.write_status()
+
+    try:
+        result = fn(*args, **kwargs)
+        tracker.set_stage('done')
+        tracker.state = 'completed'
+        return result
+
+    except PipelineCancelled:
+        tracker.state = 'cancelled'
+        done = [s['stage'] for s in tracker.completed_stages]
+        print(f"\n🛑 Run cancelled during '{tracker.stage_name}'")
+        print(f"   Outputs of completed stages are kept: {', '.join(done) or 'none'}")
+        return None
+
+    except BaseException:
+        tracker.state = 'failed'
+        raise
+
+    finally:
+        tracker.unregister()
+        signal.signal(signal.SIGINT, previous_handler)
+        tracker.compute = None
+        tracker.write_status()
+        _TRACKER = None
+        if os.path.exists(PIPELINE_CANCEL_FILE):
+            os.remove(PIPELINE_CANCEL_FILE)
@@ -0,0 +1,120 @@
+import pandas as pd
+import numpy as np
+import os
+from src.config import QUALITY_RANGES, DATA_AUDIT
+from src.paths import file_month
+
+TIMESTAMP_COLUMNS = ['pickup_time', 'dropoff_time']
+PROFILE_COLUMNS = TIMESTAMP_COLUMNS + list(QUALITY_RANGES)
+# Pseudo-column whose out_of_range count is dropoff-before-pickup rows
+REPORT_COLUMNS = PROFILE_COLUMNS + ['timestamp_order']
+
+
+def _column_values(df, column):
+    if column not in df.columns:
+        # Column missing from this file's schema: every row counts as null
+        return np.full(len(df), np.nan)
+    if column in TIMESTAMP_COLUMNS:
+        ts = df[column].to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT'))
+        values = ts.astype(np.int64).astype(float)
+        values[np.isnat(ts)] = np.nan
+        return values
+    return df[column].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _bounds(column, month):
+    if column not in TIMESTAMP_COLUMNS:
+        return QUALITY_RANGES[column]
+    if month is None:
+        return -np.inf, np.inf
+    # Pickups must fall in the file's month; dropoffs get a day of slack
+    slack = pd.Timedelta(days=1) if column == 'dropoff_time' else pd.Timedelta(0)
+    return float(month[0].value), float((month[1] + slack).value)
+
+
+def _profile_file(df, source_file):
+    month = file_month(source_file)
+    counts = np.zeros((len(REPORT_COLUMNS), 3), dtype=np.int64)
+    lows = np.full(len(REPORT_COLUMNS), np.inf)
+    highs = np.full(len(REPORT_COLUMNS), -np.inf)
+
+    for i, column in enumerate(PROFILE_COLUMNS):
+        values = _column_values(df, column)
+        nulls = np.isnan(values)
+        present = values[~nulls]
+        lo, hi = _bounds(column, month)
+
+        counts[i] = [len(values), nulls.sum(), ((present < lo) | (present >= hi)).sum()]
+        if len(present):
+            lows[i], highs[i] = present.min(), present.max()
+
+    pickup = _column_values(df, 'pickup_time')
+    dropoff = _column_values(df, 'dropoff_time')
+    counts[-1] = [len(df), 0, (dropoff < pickup).sum()]
+
+    return {'counts': counts, 'min': lows, 'max': highs}
+
+
+def profile_partition(df):
+    profile = {}
+    if len(df) == 0:
+        return profile
+
+    if 'source_file' not in df.columns:
+        return {'unknown': _profile_file(df, 'unknown')}
+
+    sources = df['source_file'].to_numpy(dtype=object)
+    for source_file in pd.unique(sources):
+        profile[str(source_file)] = _profile_file(df[sources == source_file], source_file)
+
+    return profile
+
+
+def _format_bound(column, value):
+    if not np.isfinite(value):
+        return None
+    if column in TIMESTAMP_COLUMNS:
+        return str(pd.Timestamp(int(value)))
+    return f'{value:g}'
+
+
+def profile_to_frame(profile):
+    rows = []
+    for source_file, cells in sorted(profile.items()):
+        for i, column in enumerate(REPORT_COLUMNS):
+            n_rows, nulls, out_of_range = cells['counts'][i]
+            rows.append({
+                'source_file': source_file,
+                'column': column,
+                'rows': int(n_rows),
+                'null_count': int(nulls),
+                'null_pct': nulls / n_rows * 100 if n_rows else 0.0,
+                'out_of_range': int(out_of_range),
+                'min': _format_bound(column, cells['min'][i]),
+                'max': _format_bound(column, cells['max'][i])
+            })
+    return pd.DataFrame(rows)
+
+
+def save_quality_report(profile, name='data_quality.parquet'):
+    report = profile_to_frame(profile)
+    if report.empty:
+        print("⚠️  Empty data-quality profile")
+        return report
+
+    os.makedirs(DATA_AUDIT, exist_ok=True)
+    report.to_parquet(os.path.join(DATA_AUDIT, name), index=False)
+
+    issues = report[(report['null_count'] > 0) | (report['out_of_range'] > 0)]
+    print(f"🩺 Data quality: {report['source_file'].nunique()} files profiled, "
+          f"{len(issues)} file/column pairs with nulls or out-of-range values")
+
+    for _, row in report[report['null_pct'] == 100].iterrows():
+        print(f"   ⚠️  {row['source_file']}: column '{row['column']}' missing")
+
+    order = report[(report['column'] == 'timestamp_order') & (report['out_of_range'] > 0)]
+    if not order.empty:
+        print(f"   ⚠️  {order['out_of_range'].sum():,} trips with dropoff before pickup")
+
+    print(f"💾 Quality report saved: {name}")
+    return report
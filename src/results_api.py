@@ -0,0 +1,282 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from functools import lru_cache
+import pandas as pd
+import numpy as np
+import hashlib
+import glob
+import json
+import io
+import os
+from src.config import (
+    CONGESTION_START_DATE,
+    CONGESTION_ZONE_IDS,
+    SURCHARGE_PER_TRIP,
+    N_LOCATIONS,
+    DATA_PROCESSED,
+    DATA_AUDIT,
+    DATA_OD,
+    API_HOST,
+    API_PORT,
+    API_CACHE_SIZE
+)
+
+# Read-only over files the pipeline already wrote; nothing here touches Dask
+ZONE_MASK = np.zeros(N_LOCATIONS, dtype=bool)
+ZONE_MASK[CONGESTION_ZONE_IDS] = True
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _sources(endpoint):
+    return {
+        'summary': [os.path.join(DATA_PROCESSED, 'summary_statistics.csv')],
+        'volume': [os.path.join(DATA_PROCESSED, 'daily_zone_trips.parquet')],
+        'anomalies': [os.path.join(DATA_AUDIT, 'anomalies.parquet')]
+    }.get(endpoint) or sorted(glob.glob(os.path.join(DATA_OD, 'od_*.npz')))
+
+
+def aggregate_version(endpoint):
+    # Changes whenever a backing file is rewritten, which invalidates ETags
+    # and cache entries without any explicit purge
+    stamp = [
+        (os.path.basename(p), os.stat(p).st_mtime_ns, os.stat(p).st_size)
+        for p in _sources(endpoint) if os.path.exists(p)
+    ]
+    if not stamp:
+        raise ApiError(404, f"No aggregates for '{endpoint}'. Run pipeline.py first.")
+    return hashlib.sha1(repr(stamp).encode()).hexdigest()[:16]
+
+
+def _period_range(period):
+    # 'YYYY' or 'YYYY-MM' -> [start, end)
+    try:
+        start = pd.Period(period, freq='M' if len(period) > 4 else 'Y')
+    except ValueError:
+        raise ApiError(400, f"Bad period '{period}', expected YYYY or YYYY-MM")
+    return start.start_time, (start + 1).start_time
+
+
+def _od_months(period, since=None):
+    # Monthly files, plus the split-off part of the toll-start month;
+    # since drops segments that begin before that date
+    start, end = _period_range(period) if period is not None else (pd.Timestamp.min, pd.Timestamp.max)
+    if since is not None:
+        start = max(start, pd.Timestamp(since))
+    return [
+        path for path in _sources('od')
+        if start <= pd.Timestamp(os.path.basename(path)[3:-4]) < end
+    ]
+
+
+def _od_layers(period, names, since=None):
+    totals = {name: np.zeros((N_LOCATIONS, N_LOCATIONS)) for name in names}
+    for path in _od_months(period, since):
+        with np.load(path) as data:
+            for name in names:
+                if name in data:
+                    totals[name] += data[name]
+    return totals
+
+
+def _zone_filter(frame, zone, column='pickup_loc'):
+    return frame if zone is None else frame[frame[column] == zone]
+
+
+def query_summary(period, taxi_type, zone):
+    return pd.read_csv(_sources('summary')[0])
+
+
+def query_compliance(period, taxi_type, zone):
+    # Same window as the pipeline's compliance_rate: tolled days only
+    layers = _od_layers(period, ['trips', 'no_surcharge'], since=CONGESTION_START_DATE)
+    entering = layers['trips'][:, ZONE_MASK].sum(axis=1)
+    missing = layers['no_surcharge'][:, ZONE_MASK].sum(axis=1)
+    frame = pd.DataFrame({
+        'pickup_loc': np.arange(N_LOCATIONS),
+        'entering': entering.astype(np.int64),
+        'without_surcharge': missing.astype(np.int64)
+    })[~ZONE_MASK]
+    frame = frame[frame['entering'] > 0]
+    frame['compliance_rate'] = (1 - frame['without_surcharge'] / frame['entering']) * 100
+    return _zone_filter(frame, zone)
+
+
+def query_revenue(period, taxi_type, zone):
+    # total_revenue uses the pipeline's definition (zone-entering trips x
+    # SURCHARGE_PER_TRIP) so it sums to summary_statistics.csv;
+    # surcharge_collected is what those trips actually recorded
+    layers = _od_layers(period, ['trips', 'surcharge'], since=CONGESTION_START_DATE)
+    entering = layers['trips'][:, ZONE_MASK].sum(axis=1)
+    frame = pd.DataFrame({
+        'pickup_loc': np.arange(N_LOCATIONS),
+        'entering': entering.astype(np.int64),
+        'total_revenue': entering * SURCHARGE_PER_TRIP,
+        'surcharge_collected': layers['surcharge'][:, ZONE_MASK].sum(axis=1)
+    })[~ZONE_MASK]
+    return _zone_filter(frame[frame['entering'] > 0], zone)
+
+
+def query_speed(period, taxi_type, zone):
+    layers = _od_layers(period, ['distance', 'duration_hours'])
+    hours = layers['duration_hours'].sum(axis=1)
+    frame = pd.DataFrame({
+        'pickup_loc': np.arange(N_LOCATIONS),
+        'distance_miles': layers['distance'].sum(axis=1),
+        'hours': hours
+    })
+    frame = frame[frame['hours'] > 0]
+    frame['avg_speed_mph'] = frame['distance_miles'] / frame['hours']
+    return _zone_filter(frame, zone)
+
+
+def query_volume(period, taxi_type, zone):
+    frame = pd.read_parquet(_sources('volume')[0])
+    if period is not None:
+        start, end = _period_range(period)
+        frame = frame[(frame['date'] >= start) & (frame['date'] < end)]
+    if taxi_type is not None:
+        frame = frame[frame['taxi_type'] == taxi_type]
+    frame = _zone_filter(frame, zone)
+    return frame.groupby(['date', 'taxi_type'], as_index=False)['trips'].sum()
+
+
+def query_anomalies(period, taxi_type, zone):
+    frame = pd.read_parquet(_sources('anomalies')[0])
+    if period is not None:
+        start, end = _period_range(period)
+        frame = frame[(frame['date'] >= start) & (frame['date'] < end)]
+    return frame
+
+
+ENDPOINTS = {
+    'summary': query_summary,
+    'compliance': query_compliance,
+    'revenue': query_revenue,
+    'speed': query_speed,
+    'volume': query_volume,
+    'anomalies': query_anomalies
+}
+
+# Filters each endpoint can honour; the OD matrices carry no taxi_type axis,
+# so asking for one there is an error rather than a silently pooled answer
+ENDPOINT_FILTERS = {
+    'summary': set(),
+    'compliance': {'period', 'zone'},
+    'revenue': {'period', 'zone'},
+    'speed': {'period', 'zone'},
+    'volume': {'period', 'taxi_type', 'zone'},
+    'anomalies': {'period'}
+}
+
+
+def _encode(frame, fmt):
+    if fmt == 'arrow':
+        import pyarrow as pa
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_MIME
+    body = frame.to_json(orient='records', date_format='iso')
+    return body.encode(), 'application/json'
+
+
+@lru_cache(maxsize=API_CACHE_SIZE)
+def render(endpoint, period, taxi_type, zone, fmt, version):
+    # version is part of the key so a rewritten aggregate never serves stale bytes
+    frame = ENDPOINTS[endpoint](period, taxi_type, zone)
+    return _encode(frame.reset_index(drop=True), fmt)
+
+
+def parse_request(path, accept=''):
+    url = urlparse(path)
+    endpoint = url.path.strip('/')
+    if endpoint not in ENDPOINTS:
+        raise ApiError(404, f"Unknown endpoint '/{endpoint}'. Available: {sorted(ENDPOINTS)}")
+
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    unknown = set(query) - {'period', 'taxi_type', 'zone', 'format'}
+    if unknown:
+        raise ApiError(400, f"Unknown parameters: {sorted(unknown)}")
+    unsupported = set(query) - ENDPOINT_FILTERS[endpoint] - {'format'}
+    if unsupported:
+        raise ApiError(
+            400, f"/{endpoint} does not support {sorted(unsupported)}; "
+                 f"filters: {sorted(ENDPOINT_FILTERS[endpoint]) or 'none'}"
+        )
+
+    zone = query.get('zone')
+    if zone is not None:
+        if not zone.isdigit() or not 0 < int(zone) < N_LOCATIONS:
+            raise ApiError(400, f"Bad zone '{zone}', expected a LocationID")
+        zone = int(zone)
+
+    taxi_type = query.get('taxi_type')
+    if taxi_type not in (None, 'yellow', 'green'):
+        raise ApiError(400, f"Bad taxi_type '{taxi_type}', expected yellow or green")
+
+    fmt = query.get('format') or ('arrow' if ARROW_MIME in accept else 'json')
+    if fmt not in ('json', 'arrow'):
+        raise ApiError(400, f"Bad format '{fmt}', expected json or arrow")
+
+    return endpoint, query.get('period'), taxi_type, zone, fmt
+
+
+class ResultsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            endpoint, period, taxi_type, zone, fmt = parse_request(
+                self.path, self.headers.get('Accept', '')
+            )
+            version = aggregate_version(endpoint)
+            etag = '"' + hashlib.sha1(
+                repr((version, endpoint, period, taxi_type, zone, fmt)).encode()
+            ).hexdigest()[:20] + '"'
+
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            body, content_type = render(endpoint, period, taxi_type, zone, fmt, version)
+            self._send(200, body, content_type, etag)
+
+        except ApiError as e:
+            self._send(e.status, json.dumps({'error': str(e)}).encode(), 'application/json')
+        except Exception as e:
+            self._send(500, json.dumps({'error': str(e)}).encode(), 'application/json')
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=API_HOST, port=API_PORT):
+    server = ThreadingHTTPServer((host, port), ResultsHandler)
+    print(f"🌐 Serving results API on http://{host}:{port} (endpoints: {', '.join(ENDPOINTS)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Results API stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,199 @@
+import dask.dataframe as dd
+import pyarrow.parquet as pq
+import pandas as pd
+import numpy as np
+import glob
+import os
+import zlib
+from src.config import (
+    DATA_RAW,
+    SAMPLE_FRACTION,
+    SAMPLE_SEED,
+    SAMPLE_CONFIDENCE_Z,
+    SURCHARGE_PER_TRIP,
+    CONGESTION_START_DATE
+)
+from src.data_loader import FILE_PATTERN, read_row_group
+
+# Per-row-group totals; every reported preview metric is built from these
+SAMPLE_TOTALS = ['trips', 'ghost_trip_count', 'entering', 'entering_with_surcharge']
+
+
+def plan_sample(fraction=SAMPLE_FRACTION, seed=SAMPLE_SEED, years=(2024, 2025)):
+    # One stratum per raw file (taxi type x year x month). Row groups are
+    # picked by a seed derived from the file name, so reruns read the same ones.
+    plan = []
+    for path in sorted(glob.glob(os.path.join(DATA_RAW, '*_tripdata_*.parquet'))):
+        match = FILE_PATTERN.search(os.path.basename(path))
+        if not match or int(match.group(2)) not in years:
+            continue
+
+        taxi_type, year, month = match.group(1), int(match.group(2)), int(match.group(3))
+        n_groups = pq.ParquetFile(path).metadata.num_row_groups
+        if n_groups == 0:
+            continue
+
+        # Two row groups per stratum at least, so every stratum has a
+        # within-stratum variance; single-group files are read whole
+        n_pick = min(n_groups, max(2, int(np.ceil(n_groups * fraction))))
+        rng = np.random.default_rng(zlib.crc32(f'{seed}:{os.path.basename(path)}'.encode()))
+        picked = np.sort(rng.choice(n_groups, size=n_pick, replace=False))
+
+        for rg in picked:
+            plan.append({
+                'path': path,
+                'row_group': int(rg),
+                'taxi_type': taxi_type,
+                'stratum': f'{taxi_type}_{year}-{month:02d}',
+                'stratum_groups': n_groups,
+                'stratum_sampled': n_pick
+            })
+
+    return plan
+
+
+def _read_row_group(part, dtype_backend=None):
+    df = read_row_group(part, dtype_backend)
+    df['stratum'] = part['stratum']
+    df['stratum_groups'] = part['stratum_groups']
+    df['stratum_sampled'] = part['stratum_sampled']
+    return df
+
+
+def load_sample(fraction=SAMPLE_FRACTION, seed=SAMPLE_SEED, dtype_backend=None):
+    plan = plan_sample(fraction, seed)
+
+    if not plan:
+        raise ValueError("❌ No data files found! Please download data first.")
+
+    n_strata = len({p['stratum'] for p in plan})
+    n_total = sum(p['stratum_groups'] / p['stratum_sampled'] for p in plan)
+    print(f"🎯 Sampling {len(plan)} of {n_total:.0f} row groups across {n_strata} strata "
+          f"(fraction={fraction}, seed={seed})")
+
+    # One partition per row group: each partition is one sampled cluster
+    return dd.from_map(_read_row_group, plan, dtype_backend=dtype_backend)
+
+
+def expansion_weights(df):
+    # Each sampled row stands for stratum_groups / stratum_sampled rows of a
+    # full run; None outside preview mode so full-run counts stay integers
+    if 'stratum_groups' not in df.columns:
+        return None
+    return (df['stratum_groups'] / df['stratum_sampled']).to_numpy(dtype=float)
+
+
+def weighted_bincount(codes, rows, weights, minlength, values=None):
+    # np.bincount over the selected rows, scaled by the expansion weights if any
+    if weights is not None:
+        values = weights if values is None else values * weights
+    return np.bincount(
+        codes[rows], weights=None if values is None else values[rows], minlength=minlength
+    )
+
+
+def _partition_totals(df):
+    if len(df) == 0:
+        return pd.DataFrame(columns=['stratum', 'stratum_groups', 'stratum_sampled'] + SAMPLE_TOTALS)
+
+    entering = (
+        (df['ghost_reason'] == 'Clean') &
+        df['enters_zone'] &
+        (df['pickup_time'] >= pd.Timestamp(CONGESTION_START_DATE))
+    ).fillna(False)
+
+    return pd.DataFrame({
+        'stratum': [df['stratum'].iloc[0]],
+        'stratum_groups': [int(df['stratum_groups'].iloc[0])],
+        'stratum_sampled': [int(df['stratum_sampled'].iloc[0])],
+        'trips': [len(df)],
+        'ghost_trip_count': [int((df['ghost_reason'] != 'Clean').sum())],
+        'entering': [int(entering.sum())],
+        'entering_with_surcharge': [int((entering & (df['congestion_surcharge'] > 0)).fillna(False).sum())]
+    })
+
+
+def stratified_total(totals, column):
+    # Expansion estimator for a stratified cluster sample and its variance
+    estimate = 0.0
+    variance = 0.0
+    for _, group in totals.groupby('stratum'):
+        n_groups = group['stratum_groups'].iloc[0]
+        n_sampled = group['stratum_sampled'].iloc[0]
+        # Row groups left empty by de-duplication still count, as zeros
+        values = group[column].to_numpy(dtype=float)
+        values = np.append(values, np.zeros(n_sampled - len(values)))
+
+        estimate += n_groups / n_sampled * values.sum()
+        if n_sampled > 1:
+            fpc = 1 - n_sampled / n_groups
+            variance += n_groups ** 2 * fpc * values.var(ddof=1) / n_sampled
+
+    return estimate, variance
+
+
+def ratio_variance(totals, num, den, ratio):
+    # Linearised residual y - R * x, so a ratio reuses the total's variance
+    _, variance = stratified_total(totals.assign(_z=totals[num] - ratio * totals[den]), '_z')
+    return variance
+
+
+def _row(metric, estimate, std_error, sample_value):
+    half_width = SAMPLE_CONFIDENCE_Z * std_error
+    return {
+        'metric': metric,
+        'estimate': estimate,
+        'std_error': std_error,
+        'ci_low': estimate - half_width,
+        'ci_high': estimate + half_width,
+        'rel_error_pct': half_width / abs(estimate) * 100 if estimate else np.nan,
+        'sample_value': sample_value
+    }
+
+
+def estimate_preview_metrics(flagged_ddf, surcharge_per_trip=SURCHARGE_PER_TRIP):
+    print("   Computing per-row-group totals...")
+
+    totals = flagged_ddf.map_partitions(
+        _partition_totals,
+        meta={
+            'stratum': 'object', 'stratum_groups': 'int64', 'stratum_sampled': 'int64',
+            **{col: 'int64' for col in SAMPLE_TOTALS}
+        }
+    ).compute()
+
+    rows = []
+    estimates = {}
+    for column in SAMPLE_TOTALS:
+        estimate, variance = stratified_total(totals, column)
+        estimates[column] = estimate
+        rows.append(_row(column, estimate, np.sqrt(variance), totals[column].sum()))
+
+    revenue_se = rows[SAMPLE_TOTALS.index('entering')]['std_error'] * surcharge_per_trip
+    rows.append(_row(
+        'total_revenue',
+        estimates['entering'] * surcharge_per_trip,
+        revenue_se,
+        totals['entering'].sum() * surcharge_per_trip
+    ))
+
+    for metric, num, den in [
+        ('compliance_rate', 'entering_with_surcharge', 'entering'),
+        ('ghost_rate', 'ghost_trip_count', 'trips')
+    ]:
+        if estimates[den] == 0:
+            rows.append(_row(metric, 0.0, np.nan, 0.0))
+            continue
+        ratio = estimates[num] / estimates[den]
+        variance = ratio_variance(totals, num, den, ratio)
+        sample_den = totals[den].sum()
+        rows.append(_row(
+            metric,
+            ratio * 100,
+            np.sqrt(variance) / estimates[den] * 100,
+            totals[num].sum() / sample_den * 100 if sample_den else 0.0
+        ))
+
+    preview = pd.DataFrame(rows).set_index('metric')
+    print(f"   ✅ Estimated {len(preview)} metrics from {len(totals)} row groups")
+    return preview
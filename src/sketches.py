@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import os
+from src.config import (
+    SKETCH_YEARS,
+    SKETCH_ZONE_CLASSES,
+    SKETCH_RELATIVE_ACCURACY,
+    SKETCH_QUANTILES,
+    SKETCH_METRICS,
+    DATA_PROCESSED
+)
+from src.partials import reduce_partitions, merge_partials
+
+# Log-bucketed histograms (DDSketch style): every bucket spans a fixed
+# relative width, so any quantile read back is within SKETCH_RELATIVE_ACCURACY
+# of the true value, and two sketches merge by plain array addition.
+GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+N_GROUPS = len(SKETCH_YEARS) * len(SKETCH_ZONE_CLASSES) * 7 * 24
+
+
+def _n_bins(lo, hi):
+    # Bucket 0 collects values <= lo (zeros, refunds, missing tips)
+    return int(np.ceil(np.log(hi / lo) / np.log(GAMMA))) + 1
+
+
+# bin_index/bin_values are shared with fare_anomalies' histograms
+def bin_index(values, lo, hi):
+    n_bins = _n_bins(lo, hi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        idx = np.ceil(np.log(values / lo) / np.log(GAMMA))
+    idx = np.where(values > lo, idx, 0)
+    return np.clip(idx, 0, n_bins - 1).astype(np.int64)
+
+
+def bin_values(lo, hi):
+    idx = np.arange(_n_bins(lo, hi))
+    values = lo * 2 * GAMMA ** idx / (GAMMA + 1)
+    values[0] = 0.0
+    return values
+
+
+def _partition_metrics(df):
+    duration_min = (df['dropoff_time'] - df['pickup_time']).dt.total_seconds().to_numpy() / 60
+    distance = df['trip_distance'].to_numpy(dtype=float)
+    fare = df['fare'].to_numpy(dtype=float)
+    tip = df['tip_amount'].to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speed = distance / (duration_min / 60)
+        tip_pct = np.where(fare > 0, tip / fare * 100, np.nan)
+    speed[~np.isfinite(speed)] = 0
+
+    return {
+        'speed_mph': speed,
+        'trip_duration_minutes': duration_min,
+        'fare': fare,
+        'tip_pct': tip_pct
+    }
+
+
+def _group_index(df):
+    pickup = df['pickup_time']
+    year = pickup.dt.year.to_numpy(dtype=float, na_value=np.nan)
+    year_idx = np.clip(np.searchsorted(SKETCH_YEARS, year), 0, len(SKETCH_YEARS) - 1)
+    valid_year = np.asarray(SKETCH_YEARS)[year_idx] == year
+
+    starts_in_zone = df['starts_in_zone'].to_numpy(dtype=bool)
+    enters_zone = df['enters_zone'].to_numpy(dtype=bool)
+    zone_class = np.where(starts_in_zone, 0, np.where(enters_zone, 1, 2))
+
+    day_of_week = pickup.dt.dayofweek.to_numpy(dtype=float, na_value=0)
+    hour = pickup.dt.hour.to_numpy(dtype=float, na_value=0)
+
+    group = ((year_idx * len(SKETCH_ZONE_CLASSES) + zone_class) * 7 + day_of_week) * 24 + hour
+    return np.where(valid_year, group, -1).astype(np.int64)
+
+
+def empty_sketch():
+    return {
+        metric: np.zeros((N_GROUPS, _n_bins(lo, hi)), dtype=np.int64)
+        for metric, (lo, hi) in SKETCH_METRICS.items()
+    }
+
+
+def sketch_partition(df):
+    sketch = empty_sketch()
+    if len(df) == 0:
+        return sketch
+
+    group = _group_index(df)
+    metrics = _partition_metrics(df)
+
+    for metric, (lo, hi) in SKETCH_METRICS.items():
+        values = metrics[metric]
+        valid = (group >= 0) & ~np.isnan(values)
+        n_bins = sketch[metric].shape[1]
+        flat = group[valid] * n_bins + bin_index(values[valid], lo, hi)
+        sketch[metric] += np.bincount(flat, minlength=N_GROUPS * n_bins).reshape(N_GROUPS, n_bins)
+
+    return sketch
+
+
+def build_quantile_sketches(ddf):
+    print("   Sketching speed, duration, fare and tip distributions...")
+
+    try:
+        sketch = reduce_partitions(ddf, sketch_partition)
+        print(f"   ✅ Sketched {int(sketch['fare'].sum()):,} trips into {N_GROUPS} groups")
+        return sketch
+
+    except Exception as e:
+        print(f"   ⚠️  Error building quantile sketches: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def save_sketch(sketch, path=None):
+    path = path or os.path.join(DATA_PROCESSED, 'quantile_sketches.npz')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, **sketch)
+    print(f"   💾 Sketch saved: {os.path.basename(path)}")
+
+
+def load_sketch(path=None):
+    path = path or os.path.join(DATA_PROCESSED, 'quantile_sketches.npz')
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {metric: data[metric] for metric in data.files}
+
+
+def merge_sketches(*sketches):
+    return merge_partials(*[s for s in sketches if s is not None])
+
+
+def sketch_quantiles(sketch, quantiles=SKETCH_QUANTILES):
+    index = pd.MultiIndex.from_product(
+        [SKETCH_YEARS, SKETCH_ZONE_CLASSES, range(7), range(24)],
+        names=['year', 'zone_class', 'day_of_week', 'hour']
+    )
+    result = pd.DataFrame(index=index)
+
+    for metric, (lo, hi) in SKETCH_METRICS.items():
+        counts = sketch[metric]
+        totals = counts.sum(axis=1)
+        cumulative = counts.cumsum(axis=1)
+        values = bin_values(lo, hi)
+
+        result[f'{metric}_count'] = totals
+        for q in quantiles:
+            # First bucket whose cumulative count reaches rank q
+            rank = np.maximum(np.ceil(q * totals), 1)
+            idx = (cumulative < rank[:, None]).sum(axis=1)
+            idx = np.clip(idx, 0, len(values) - 1)
+            result[f'{metric}_p{q * 100:g}'] = np.where(totals > 0, values[idx], np.nan)
+
+    result = result[result['fare_count'] > 0]
+    return result
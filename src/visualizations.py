@@ -8,6 +8,28 @@ sns.set_theme(style="whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
 
+PREVIEW = False
+
+
+def set_figure_dir(path, preview=False):
+    global OUTPUT_FIGURES, PREVIEW
+    OUTPUT_FIGURES = path
+    PREVIEW = preview
+    os.makedirs(OUTPUT_FIGURES, exist_ok=True)
+
+
+def _title(title, sampling_ci=False):
+    # Preview figures say whether the sample's uncertainty is drawn
+    if not PREVIEW:
+        return title
+    note = 'with 95% sampling CI' if sampling_ci else 'point estimate, no sampling CI'
+    return f'{title}\n(preview sample: {note})'
+
+
+def _periods(table):
+    return [c for c in table.columns if not str(c).startswith('pct_change')]
+
+
 def plot_border_effect(border_comparison):
     if border_comparison.empty:
         print("⚠️  No border data to plot")
@@ -18,12 +40,21 @@ def plot_border_effect(border_comparison):
     border_sorted = border_comparison.sort_values('pct_change', ascending=False)
     
     colors = ['red' if x > 0 else 'green' for x in border_sorted['pct_change']]
-    
-    ax.barh(range(len(border_sorted)), border_sorted['pct_change'], color=colors)
+    has_ci = 'pct_change_ci_low' in border_sorted.columns
+    xerr = None
+    if has_ci:
+        xerr = [
+            border_sorted['pct_change'] - border_sorted['pct_change_ci_low'],
+            border_sorted['pct_change_ci_high'] - border_sorted['pct_change']
+        ]
+    
+    ax.barh(range(len(border_sorted)), border_sorted['pct_change'], color=colors, xerr=xerr, capsize=3)
     ax.set_yticks(range(len(border_sorted)))
     ax.set_yticklabels([f"Zone {idx}" for idx in border_sorted.index])
-    ax.set_xlabel('% Change in Dropoffs (Q1 2024 vs Q1 2025)')
-    ax.set_title('Border Effect: Are Passengers Avoiding the Toll?', fontsize=14, fontweight='bold')
+    periods = _periods(border_comparison)
+    ax.set_xlabel(f'% Change in Dropoffs ({periods[0]} vs {periods[-1]})')
+    ax.set_title(_title('Border Effect: Are Passengers Avoiding the Toll?', has_ci),
+                 fontsize=14, fontweight='bold')
     ax.axvline(0, color='black', linewidth=0.8)
     
     plt.tight_layout()
@@ -32,20 +63,18 @@ def plot_border_effect(border_comparison):
     plt.close()
 
 
-def plot_speed_heatmap(speed_pivot):
+def plot_speed_heatmap(speed_pivot, label='Avg Speed (MPH)',
+                       title='Q1 {year}: Average Trip Speed in Congestion Zone',
+                       filename='speed_heatmap_{year}.png'):
     if speed_pivot.empty:
         print("⚠️  No speed data to plot")
         return
     
     days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     
-    for year in [2024, 2025]:
+    for year in speed_pivot.index.get_level_values(0).unique():
         try:
-            if year not in speed_pivot.index.get_level_values(0):
-                print(f"⚠️  No data for {year}")
-                continue
-            
-            data_year = speed_pivot.xs(year, level='year')
+            data_year = speed_pivot.xs(year, level=0)
             pivot_table = data_year.unstack(level='hour', fill_value=0)
             
             fig, ax = plt.subplots(figsize=(14, 6))
@@ -54,23 +83,64 @@ def plot_speed_heatmap(speed_pivot):
                 cmap='RdYlGn', 
                 annot=False, 
                 fmt='.1f',
-                cbar_kws={'label': 'Avg Speed (MPH)'},
+                cbar_kws={'label': label},
                 yticklabels=days,
                 ax=ax
             )
-            ax.set_title(f'Q1 {year}: Average Trip Speed in Congestion Zone', 
-                         fontsize=14, fontweight='bold')
+            ax.set_title(_title(title.format(year=year)), fontsize=14, fontweight='bold')
             ax.set_xlabel('Hour of Day')
             ax.set_ylabel('Day of Week')
             
             plt.tight_layout()
-            plt.savefig(os.path.join(OUTPUT_FIGURES, f'speed_heatmap_{year}.png'), dpi=300)
-            print(f"✅ Saved: speed_heatmap_{year}.png")
+            plt.savefig(os.path.join(OUTPUT_FIGURES, filename.format(year=year)), dpi=300)
+            print(f"✅ Saved: {filename.format(year=year)}")
             plt.close()
         except Exception as e:
             print(f"⚠️  Error plotting {year} heatmap: {e}")
 
 
+def plot_quantile_heatmaps(quantiles_df, metric='speed_mph', zone_class='inside'):
+    if quantiles_df is None or quantiles_df.empty:
+        print("⚠️  No quantile data to plot")
+        return
+    
+    zone_data = quantiles_df.xs(zone_class, level='zone_class')
+    quantile_cols = [c for c in zone_data.columns if c.startswith(f'{metric}_p')]
+    
+    for col in quantile_cols:
+        q = col[len(metric) + 2:]
+        plot_speed_heatmap(
+            zone_data[col],
+            label=f'P{q} {metric}',
+            title=f'{{year}}: P{q} {metric} ({zone_class} zone trips)',
+            filename=f'{metric}_p{q}_heatmap_{{year}}.png'
+        )
+
+
+def plot_event_study(events_df):
+    if events_df is None or events_df.empty:
+        print("⚠️  No event study data to plot")
+        return
+    
+    fig, ax = plt.subplots(figsize=(14, 6))
+    
+    for comparison, data in events_df.groupby('comparison'):
+        ax.plot(data['event_week'], data['effect_pct'], marker='o', markersize=3, label=comparison)
+        ax.fill_between(data['event_week'], data['ci_low_pct'], data['ci_high_pct'], alpha=0.2)
+    
+    ax.axhline(0, color='black', linewidth=0.8)
+    ax.set_xlabel('Weeks Since Congestion Pricing Start')
+    ax.set_ylabel('Effect on Daily Trips (%)')
+    ax.set_title(_title('Event Study: Difference-in-Differences with 95% Block-Bootstrap CI'),
+                 fontsize=14, fontweight='bold')
+    ax.legend()
+    
+    plt.tight_layout()
+    plt.savefig(os.path.join(OUTPUT_FIGURES, 'event_study.png'), dpi=300)
+    print(f"✅ Saved: event_study.png")
+    plt.close()
+
+
 def plot_tip_vs_surcharge(monthly_stats):
     if monthly_stats.empty:
         print("⚠️  No tip/surcharge data to plot")
@@ -93,7 +163,7 @@ def plot_tip_vs_surcharge(monthly_stats):
     ax2.set_ylabel('Average Tip (%)', color='darkred')
     ax2.tick_params(axis='y', labelcolor='darkred')
     
-    plt.title('Tip "Crowding Out" Effect: Surcharge vs Tips', fontsize=14, fontweight='bold')
+    plt.title(_title('Tip "Crowding Out" Effect: Surcharge vs Tips'), fontsize=14, fontweight='bold')
     fig.tight_layout()
     plt.savefig(os.path.join(OUTPUT_FIGURES, 'tip_vs_surcharge.png'), dpi=300)
     print(f"✅ Saved: tip_vs_surcharge.png")
@@ -118,7 +188,7 @@ def plot_rain_elasticity(wettest_data):
     
     ax.set_xlabel('Precipitation (mm)')
     ax.set_ylabel('Daily Trip Count')
-    ax.set_title('Rain Elasticity of Demand (Wettest Month 2025)', 
+    ax.set_title(_title('Rain Elasticity of Demand (Wettest Month 2025)'), 
                  fontsize=14, fontweight='bold')
     ax.legend()
     ax.grid(True, alpha=0.3)
@@ -142,36 +212,32 @@ def plot_trip_volume_change(volume_df):
     try:
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        # Check if we have both years
-        has_2024 = 2024 in volume_df.columns
-        has_2025 = 2025 in volume_df.columns
+        # Period columns are whatever the comparison window labels them (2024/2025 by default)
+        periods = _periods(volume_df)
+        has_ci = 'pct_change_ci_low' in volume_df.columns
         
-        if not has_2024 and not has_2025:
-            print("⚠️  No 2024 or 2025 data in volume_df")
+        if not periods:
+            print("⚠️  No period data in volume_df")
             return
         
-        if has_2024 and has_2025:
-            volume_df[[2024, 2025]].plot(kind='bar', ax=ax, color=['#1f77b4', '#ff7f0e'])
-            legend_labels = ['2024', '2025']
-        elif has_2024:
-            volume_df[[2024]].plot(kind='bar', ax=ax, color=['#1f77b4'])
-            legend_labels = ['2024']
-        else:
-            volume_df[[2025]].plot(kind='bar', ax=ax, color=['#ff7f0e'])
-            legend_labels = ['2025']
+        volume_df[periods].plot(kind='bar', ax=ax, color=['#1f77b4', '#ff7f0e'][:len(periods)])
+        legend_labels = [str(p) for p in periods]
         
-        ax.set_title('Q1 Trip Volume: Yellow vs Green Taxis Entering Zone', 
+        ax.set_title(_title('Q1 Trip Volume: Yellow vs Green Taxis Entering Zone', has_ci), 
                      fontsize=14, fontweight='bold')
         ax.set_xlabel('Taxi Type')
         ax.set_ylabel('Number of Trips')
         ax.set_xticklabels(volume_df.index, rotation=0)
         ax.legend(legend_labels)
         
-        if 'pct_change' in volume_df.columns and has_2024 and has_2025:
+        if 'pct_change' in volume_df.columns and len(periods) == 2:
             for i, (idx, row) in enumerate(volume_df.iterrows()):
-                max_val = max(row[2024], row[2025])
+                max_val = max(row[periods[0]], row[periods[1]])
+                label = f"{row['pct_change']:+.1f}%"
+                if has_ci:
+                    label += f"\n[{row['pct_change_ci_low']:+.1f}, {row['pct_change_ci_high']:+.1f}]"
                 ax.text(i, max_val * 1.05, 
-                        f"{row['pct_change']:+.1f}%", 
+                        label, 
                         ha='center', fontweight='bold', 
                         color='red' if row['pct_change'] < 0 else 'green')
         
@@ -0,0 +1,344 @@
+import dask.dataframe as dd
+import pyarrow.parquet as pq
+import pandas as pd
+import numpy as np
+import glob
+import os
+from src.config import (
+    DATA_RAW,
+    BORDER_ZONE_IDS,
+    N_LOCATIONS,
+    SAMPLE_CONFIDENCE_Z,
+    UNIFIED_SCHEMA,
+    GREEN_SCHEMA
+)
+from src.data_loader import FILE_PATTERN, read_row_group
+from src.partials import reduce_partitions
+from src.sampling import expansion_weights, weighted_bincount, stratified_total, ratio_variance
+
+TAXI_TYPES = ['yellow', 'green']
+PERIODS = ['baseline', 'treatment']
+
+
+def make_window(name, baseline, treatment):
+    # Periods are [start, end) date pairs
+    return {
+        'name': name,
+        'baseline': (pd.Timestamp(baseline[0]), pd.Timestamp(baseline[1])),
+        'treatment': (pd.Timestamp(treatment[0]), pd.Timestamp(treatment[1]))
+    }
+
+
+def rolling_windows(start, end, length_days=28, step_days=28, offset_days=364):
+    # Treatment windows slide over [start, end); each baseline is the same
+    # span offset_days earlier (364 keeps weekdays aligned year over year).
+    windows = []
+    window_start = pd.Timestamp(start)
+    length = pd.Timedelta(days=length_days)
+    offset = pd.Timedelta(days=offset_days)
+
+    while window_start + length <= pd.Timestamp(end):
+        window_end = window_start + length
+        windows.append(make_window(
+            f'rolling_{window_start:%Y-%m-%d}',
+            (window_start - offset, window_end - offset),
+            (window_start, window_end)
+        ))
+        window_start += pd.Timedelta(days=step_days)
+
+    return windows
+
+
+def period_labels(window):
+    baseline_start = window['baseline'][0]
+    treatment_start = window['treatment'][0]
+    if baseline_start.year != treatment_start.year:
+        return baseline_start.year, treatment_start.year
+    return f'{baseline_start:%Y-%m-%d}', f'{treatment_start:%Y-%m-%d}'
+
+
+def window_ranges(windows, extra_periods=()):
+    # Every [start, end) range a run reads: both periods of each window plus
+    # any ranges other stages need
+    ranges = [window[period] for window in windows for period in PERIODS]
+    ranges += [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in extra_periods]
+    return ranges
+
+
+def _overlaps(first, last, ranges):
+    # Closed [first, last] against half-open [start, end)
+    return any(first < end and last >= start for start, end in ranges)
+
+
+def _row_group_span(metadata, row_group, column):
+    stats = metadata.row_group(row_group).column(column).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    return pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+
+
+def plan_window_reads(windows, extra_periods=()):
+    # Files are picked by the month in their name, then row groups by their
+    # pickup-time statistics; row groups without statistics are always read.
+    ranges = window_ranges(windows, extra_periods)
+    plan = []
+    skipped = 0
+
+    for path in sorted(glob.glob(os.path.join(DATA_RAW, '*_tripdata_*.parquet'))):
+        match = FILE_PATTERN.search(os.path.basename(path))
+        if not match:
+            continue
+
+        taxi_type = match.group(1)
+        month_start = pd.Timestamp(year=int(match.group(2)), month=int(match.group(3)), day=1)
+        month_end = month_start + pd.offsets.MonthBegin(1)
+        if not _overlaps(month_start, month_end - pd.Timedelta(1), ranges):
+            continue
+
+        metadata = pq.ParquetFile(path).metadata
+        schema = GREEN_SCHEMA if taxi_type == 'green' else UNIFIED_SCHEMA
+        names = metadata.schema.names
+        column = names.index(schema['pickup_time']) if schema['pickup_time'] in names else None
+
+        for rg in range(metadata.num_row_groups):
+            span = _row_group_span(metadata, rg, column) if column is not None else None
+            if span is not None and not _overlaps(*span, ranges):
+                skipped += 1
+                continue
+            plan.append({'path': path, 'row_group': rg, 'taxi_type': taxi_type})
+
+    return plan, skipped
+
+
+def load_window_data(windows, extra_periods=(), dtype_backend=None):
+    # Reads only the files and row groups the windows (and extra_periods)
+    # touch; one partition per row group, as in the sample loader.
+    plan, skipped = plan_window_reads(windows, extra_periods)
+
+    if not plan:
+        raise ValueError("❌ No data files found for the requested periods! Please download data first.")
+
+    n_files = len({p['path'] for p in plan})
+    print(f"📂 Loading {len(plan)} row groups from {n_files} files for {len(windows)} comparison windows "
+          f"({skipped} row groups skipped by pickup-time statistics)")
+
+    return dd.from_map(read_row_group, plan, dtype_backend=dtype_backend)
+
+
+def window_partition(df, windows, weighted=True):
+    result = {}
+    if len(df) == 0:
+        return result
+
+    pickup = df['pickup_time'].to_numpy(dtype='datetime64[ns]', na_value=np.datetime64('NaT'))
+    taxi_idx = (df['taxi_type'] == 'green').to_numpy(dtype=int)
+    entering = df['enters_zone'].to_numpy(dtype=bool, na_value=False)
+    in_zone = df['starts_in_zone'].to_numpy(dtype=bool, na_value=False)
+    dropoff = df['dropoff_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+    speed = df['speed_mph'].to_numpy(dtype=float, na_value=0)
+    slot = (
+        df['pickup_time'].dt.dayofweek.to_numpy(dtype=float, na_value=0) * 24 +
+        df['pickup_time'].dt.hour.to_numpy(dtype=float, na_value=0)
+    ).astype(np.int64)
+
+    valid_loc = (dropoff >= 0) & (dropoff < N_LOCATIONS)
+    weights = expansion_weights(df) if weighted else None
+    first, last = np.nanmin(pickup), np.nanmax(pickup)
+
+    for window in windows:
+        for period in PERIODS:
+            start, end = (np.datetime64(t) for t in window[period])
+            if last < start or first >= end:
+                continue
+
+            rows = (pickup >= start) & (pickup < end)
+            if not rows.any():
+                continue
+
+            zone_rows = rows & in_zone
+            result[f"{window['name']}|{period}"] = {
+                'volume': weighted_bincount(taxi_idx, rows & entering, weights, len(TAXI_TYPES)),
+                'dropoffs': weighted_bincount(dropoff, rows & valid_loc, weights, N_LOCATIONS),
+                'speed_sum': weighted_bincount(slot, zone_rows, weights, 7 * 24, values=speed),
+                'speed_count': weighted_bincount(slot, zone_rows, weights, 7 * 24)
+            }
+
+    return result
+
+
+def evaluate_windows(ddf, windows):
+    print(f"   Evaluating {len(windows)} comparison windows in one scan...")
+
+    try:
+        results = reduce_partitions(ddf, lambda df: window_partition(df, windows))
+        print(f"   ✅ Collected {len(results)} window periods")
+        return results
+
+    except Exception as e:
+        print(f"   ⚠️  Error evaluating comparison windows: {e}")
+        import traceback
+        traceback.print_exc()
+        return {}
+
+
+def _pct_change(table, base, treat):
+    table['pct_change'] = (table[treat] - table[base]) / table[base].replace(0, 1) * 100
+    table.loc[table[base] == 0, 'pct_change'] = 0
+    return table
+
+
+def summarize_window(results, window):
+    base_label, treat_label = period_labels(window)
+    empty = {
+        'volume': np.zeros(len(TAXI_TYPES), dtype=np.int64),
+        'dropoffs': np.zeros(N_LOCATIONS, dtype=np.int64),
+        'speed_sum': np.zeros(7 * 24),
+        'speed_count': np.zeros(7 * 24, dtype=np.int64)
+    }
+    base = results.get(f"{window['name']}|baseline", empty)
+    treat = results.get(f"{window['name']}|treatment", empty)
+
+    volume = pd.DataFrame(
+        {base_label: base['volume'], treat_label: treat['volume']},
+        index=pd.Index(TAXI_TYPES, name='taxi_type')
+    )
+    volume.columns.name = 'year'
+    volume = _pct_change(volume[volume.sum(axis=1) > 0], base_label, treat_label)
+
+    border = pd.DataFrame(
+        {base_label: base['dropoffs'][BORDER_ZONE_IDS], treat_label: treat['dropoffs'][BORDER_ZONE_IDS]},
+        index=pd.Index(BORDER_ZONE_IDS, name='dropoff_loc')
+    )
+    border.columns.name = 'year'
+    border = _pct_change(border[border.sum(axis=1) > 0], base_label, treat_label)
+
+    speeds = []
+    for label, period in [(base_label, base), (treat_label, treat)]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = period['speed_sum'] / period['speed_count']
+        index = pd.MultiIndex.from_product(
+            [[label], range(7), range(24)], names=['year', 'day_of_week', 'hour']
+        )
+        speeds.append(pd.Series(mean, index=index, name='speed_mph'))
+    speed = pd.concat(speeds).dropna()
+
+    return {'volume': volume, 'border': border, 'speed': speed}
+
+
+def windows_to_frame(results, windows):
+    rows = []
+    for window in windows:
+        summary = summarize_window(results, window)
+        base_label, treat_label = period_labels(window)
+        for analysis in ['volume', 'border']:
+            for key, row in summary[analysis].iterrows():
+                rows.append({
+                    'window': window['name'],
+                    'analysis': analysis,
+                    'key': key,
+                    'baseline_start': window['baseline'][0],
+                    'treatment_start': window['treatment'][0],
+                    'baseline': row[base_label],
+                    'treatment': row[treat_label],
+                    'pct_change': row['pct_change']
+                })
+    return pd.DataFrame(rows)
+
+
+def _cluster_columns(windows):
+    columns = []
+    for window in windows:
+        for period in PERIODS:
+            key = f"{window['name']}|{period}"
+            columns += [f'{key}|volume|{taxi}' for taxi in TAXI_TYPES]
+            columns += [f'{key}|border|{zone}' for zone in BORDER_ZONE_IDS]
+    return columns
+
+
+def _cluster_totals(df, windows):
+    # Unweighted volume/border totals of one sampled row group (a cluster)
+    columns = _cluster_columns(windows)
+    if len(df) == 0:
+        return pd.DataFrame(columns=['stratum', 'stratum_groups', 'stratum_sampled'] + columns)
+
+    counts = window_partition(df, windows, weighted=False)
+    row = {
+        'stratum': df['stratum'].iloc[0],
+        'stratum_groups': int(df['stratum_groups'].iloc[0]),
+        'stratum_sampled': int(df['stratum_sampled'].iloc[0])
+    }
+    for window in windows:
+        for period in PERIODS:
+            key = f"{window['name']}|{period}"
+            part = counts.get(key)
+            volume = part['volume'] if part else np.zeros(len(TAXI_TYPES))
+            dropoffs = part['dropoffs'][BORDER_ZONE_IDS] if part else np.zeros(len(BORDER_ZONE_IDS))
+            row.update({f'{key}|volume|{taxi}': v for taxi, v in zip(TAXI_TYPES, volume)})
+            row.update({f'{key}|border|{zone}': v for zone, v in zip(BORDER_ZONE_IDS, dropoffs)})
+    return pd.DataFrame([row])
+
+
+def window_cluster_totals(ddf, windows):
+    # Preview only: one row per sampled row group, for the stratified
+    # variance of the volume and border comparisons
+    print("   Computing per-row-group window totals for confidence intervals...")
+
+    try:
+        meta = {
+            'stratum': 'object', 'stratum_groups': 'int64', 'stratum_sampled': 'int64',
+            **{col: 'float64' for col in _cluster_columns(windows)}
+        }
+        totals = ddf.map_partitions(_cluster_totals, windows, meta=meta).compute()
+        print(f"   ✅ Collected window totals from {len(totals)} row groups")
+        return totals
+
+    except Exception as e:
+        print(f"   ⚠️  Error computing window confidence intervals: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def window_intervals(totals, windows):
+    # Standard errors and CIs for every volume/border row of windows_to_frame;
+    # pct_change uses the linearised ratio treatment / baseline
+    rows = []
+    for window in windows:
+        for analysis, keys in [('volume', TAXI_TYPES), ('border', BORDER_ZONE_IDS)]:
+            for key in keys:
+                base_col, treat_col = (f"{window['name']}|{period}|{analysis}|{key}" for period in PERIODS)
+                base, base_var = stratified_total(totals, base_col)
+                _, treat_var = stratified_total(totals, treat_col)
+                row = {
+                    'window': window['name'],
+                    'analysis': analysis,
+                    'key': key,
+                    'baseline_se': np.sqrt(base_var),
+                    'treatment_se': np.sqrt(treat_var),
+                    'pct_change_se': np.nan
+                }
+                if base > 0:
+                    ratio = stratified_total(totals, treat_col)[0] / base
+                    row['pct_change_se'] = np.sqrt(ratio_variance(totals, treat_col, base_col, ratio)) / base * 100
+                rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def add_window_intervals(frame, intervals):
+    frame = frame.merge(intervals, on=['window', 'analysis', 'key'], how='left')
+    for column in ['baseline', 'treatment', 'pct_change']:
+        half_width = SAMPLE_CONFIDENCE_Z * frame[f'{column}_se']
+        frame[f'{column}_ci_low'] = frame[column] - half_width
+        frame[f'{column}_ci_high'] = frame[column] + half_width
+    return frame
+
+
+def summary_intervals(summary, frame, window):
+    # Copies one window's pct_change CIs onto its summarize_window tables
+    for analysis in ['volume', 'border']:
+        rows = frame[(frame['window'] == window['name']) & (frame['analysis'] == analysis)]
+        rows = rows.set_index('key')
+        table = summary[analysis]
+        for column in ['pct_change_ci_low', 'pct_change_ci_high']:
+            table[column] = rows[column].reindex(table.index).to_numpy()
+    return summary
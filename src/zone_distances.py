@@ -0,0 +1,160 @@
+import pandas as pd
+import numpy as np
+import os
+from src.config import (
+    N_LOCATIONS,
+    ZONE_SHAPEFILE,
+    ZONE_CENTROIDS_FILE,
+    ZONE_DISTANCES_FILE,
+    MIN_DISTANCE_RATIO,
+    MAX_DISTANCE_RATIO,
+    DISTANCE_SLACK_MILES
+)
+from src.zone_geometry import read_zone_shapes, fetch_zone_shapefile
+
+FEET_PER_MILE = 5280.0
+MILES_PER_DEGREE_LAT = 69.0
+# Boundary vertices kept per zone for the pairwise minimum-distance search
+MAX_VERTICES = 100
+
+_MATRICES = {}
+
+
+def _to_miles(rings):
+    # TLC ships the zones in NY state plane feet; geographic copies get an
+    # equirectangular projection, which is accurate enough at city scale.
+    all_points = np.concatenate([r for zone in rings.values() for r in zone])
+    if np.abs(all_points).max() <= 180:
+        lat0 = np.radians(all_points[:, 1].mean())
+        scale = np.array([MILES_PER_DEGREE_LAT * np.cos(lat0), MILES_PER_DEGREE_LAT])
+    else:
+        scale = np.array([1 / FEET_PER_MILE, 1 / FEET_PER_MILE])
+    return {zone: [r * scale for r in zone_rings] for zone, zone_rings in rings.items()}
+
+
+def read_zone_rings(shapefile=ZONE_SHAPEFILE):
+    return _to_miles(read_zone_shapes(shapefile))
+
+
+def _centroid(zone_rings):
+    # Area-weighted shoelace centroid; hole rings carry the opposite sign
+    area = cx = cy = 0.0
+    for ring in zone_rings:
+        x, y = ring[:, 0], ring[:, 1]
+        x1, y1 = np.roll(x, -1), np.roll(y, -1)
+        cross = x * y1 - x1 * y
+        area += cross.sum() / 2
+        cx += ((x + x1) * cross).sum() / 6
+        cy += ((y + y1) * cross).sum() / 6
+    if area == 0:
+        points = np.concatenate(zone_rings)
+        return points[:, 0].mean(), points[:, 1].mean()
+    return cx / area, cy / area
+
+
+def _thin_boundary(zone_rings, max_vertices=MAX_VERTICES):
+    # Keep every k-th vertex; the tolerance is half the longest boundary
+    # stretch between kept vertices, so the thinned minimum stays a lower bound.
+    n_total = sum(len(r) for r in zone_rings)
+    step = max(1, int(np.ceil(n_total / max_vertices)))
+    kept = []
+    tolerance = 0.0
+    for ring in zone_rings:
+        idx = np.unique(np.append(np.arange(0, len(ring), step), len(ring) - 1))
+        path = np.concatenate([[0], np.cumsum(np.hypot(*np.diff(ring, axis=0).T))])
+        tolerance = max(tolerance, np.diff(path[idx]).max(initial=0) / 2)
+        kept.append(ring[idx])
+    return np.concatenate(kept), tolerance
+
+
+def build_zone_centroids(rings):
+    rows = [(zone, *_centroid(zone_rings)) for zone, zone_rings in sorted(rings.items())]
+    return pd.DataFrame(rows, columns=['LocationID', 'x_miles', 'y_miles'])
+
+
+def build_distance_matrices(rings, centroids):
+    print(f"   Computing zone distances for {len(rings)} zones...")
+    zones = sorted(rings)
+    centroid = np.full((N_LOCATIONS, N_LOCATIONS), np.nan)
+    minimum = np.full((N_LOCATIONS, N_LOCATIONS), np.nan)
+
+    xy = centroids.set_index('LocationID').loc[zones, ['x_miles', 'y_miles']].to_numpy()
+    gap = xy[:, None, :] - xy[None, :, :]
+    centroid[np.ix_(zones, zones)] = np.hypot(gap[..., 0], gap[..., 1])
+
+    thinned = [_thin_boundary(rings[zone]) for zone in zones]
+    points = np.concatenate([t[0] for t in thinned])
+    tolerance = np.array([t[1] for t in thinned])
+    starts = np.cumsum([0] + [len(t[0]) for t in thinned[:-1]])
+
+    for i, (boundary, _) in enumerate(thinned):
+        d = np.hypot(
+            boundary[:, 0, None] - points[None, :, 0],
+            boundary[:, 1, None] - points[None, :, 1]
+        ).min(axis=0)
+        nearest = np.minimum.reduceat(d, starts) - tolerance[i] - tolerance
+        minimum[zones[i], zones] = np.clip(nearest, 0, None)
+
+    # Vertex gaps are symmetric up to rounding; keep the smaller bound
+    minimum = np.fmin(minimum, minimum.T)
+    np.fill_diagonal(minimum, 0)
+    return {'centroid': centroid.astype(np.float32), 'minimum': minimum.astype(np.float32)}
+
+
+def build_zone_reference(shapefile=ZONE_SHAPEFILE):
+    print(f"🗺️  Building zone reference tables from {os.path.basename(shapefile)}...")
+    rings = read_zone_rings(shapefile)
+    centroids = build_zone_centroids(rings)
+    matrices = build_distance_matrices(rings, centroids)
+
+    os.makedirs(os.path.dirname(ZONE_CENTROIDS_FILE), exist_ok=True)
+    centroids.to_csv(ZONE_CENTROIDS_FILE, index=False)
+    np.savez_compressed(ZONE_DISTANCES_FILE, **matrices)
+    print(f"💾 Saved {len(centroids)} zone centroids and {N_LOCATIONS}x{N_LOCATIONS} distance matrices")
+    return matrices
+
+
+def load_distance_matrices():
+    # Cached per process so partition functions only read the file once
+    if ZONE_DISTANCES_FILE in _MATRICES:
+        return _MATRICES[ZONE_DISTANCES_FILE]
+
+    matrices = None
+    if os.path.exists(ZONE_DISTANCES_FILE):
+        with np.load(ZONE_DISTANCES_FILE) as data:
+            matrices = {'centroid': data['centroid'], 'minimum': data['minimum']}
+    elif os.path.exists(ZONE_SHAPEFILE):
+        # Built from a local shapefile only; the download lives in the
+        # builder so ghost counts never depend on network access
+        matrices = build_zone_reference()
+
+    _MATRICES[ZONE_DISTANCES_FILE] = matrices
+    return matrices
+
+
+def implausible_distance_mask(df):
+    matrices = load_distance_matrices()
+    if matrices is None or len(df) == 0:
+        return pd.Series(False, index=df.index)
+
+    pickup = df['pickup_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+    dropoff = df['dropoff_loc'].to_numpy(dtype=float, na_value=-1).astype(np.int64)
+    distance = df['trip_distance'].to_numpy(dtype=float, na_value=np.nan)
+
+    valid = (pickup >= 0) & (pickup < N_LOCATIONS) & (dropoff >= 0) & (dropoff < N_LOCATIONS)
+    code = np.where(valid, pickup * N_LOCATIONS + dropoff, 0)
+
+    # One gather per matrix; unknown zones come back as NaN and never match
+    minimum = np.where(valid, matrices['minimum'].ravel()[code], np.nan)
+    centroid = np.where(valid, matrices['centroid'].ravel()[code], np.nan)
+
+    with np.errstate(invalid='ignore'):
+        too_short = (distance > 0) & (distance < minimum * MIN_DISTANCE_RATIO)
+        too_long = (pickup != dropoff) & (distance > centroid * MAX_DISTANCE_RATIO + DISTANCE_SLACK_MILES)
+
+    return pd.Series(too_short | too_long, index=df.index)
+
+
+if __name__ == '__main__':
+    if fetch_zone_shapefile():
+        build_zone_reference()
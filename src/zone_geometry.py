@@ -0,0 +1,249 @@
+import numpy as np
+import requests
+import zipfile
+import struct
+import json
+import io
+import os
+from src.config import (
+    N_LOCATIONS,
+    ZONE_SHAPEFILE,
+    ZONE_SHAPEFILE_URL,
+    ZONE_GEOJSON_FILE,
+    MAP_SIMPLIFY_TOLERANCE,
+    MAP_COORD_DECIMALS
+)
+
+# NAD83 / New York Long Island (ftUS), the CRS of the TLC taxi zone shapefile
+GRS80_A = 6378137.0
+GRS80_E = np.sqrt(2 / 298.257222101 - (1 / 298.257222101) ** 2)
+US_FOOT = 1200 / 3937
+LCC_PARALLELS = (np.radians(40 + 40 / 60), np.radians(41 + 2 / 60))
+LCC_ORIGIN = (np.radians(40 + 10 / 60), np.radians(-74.0))
+LCC_FALSE_EASTING = 300000.0
+
+
+def fetch_zone_shapefile(url=ZONE_SHAPEFILE_URL):
+    # Used by the python -m builders only; runtime loaders read local files
+    if os.path.exists(ZONE_SHAPEFILE):
+        return True
+    print(f"🌐 Downloading taxi zone shapefile from {url}...")
+
+    try:
+        response = requests.get(url, timeout=60)
+        response.raise_for_status()
+        target = os.path.dirname(ZONE_SHAPEFILE)
+        os.makedirs(target, exist_ok=True)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            # Flatten any folder inside the archive into data/raw/taxi_zones/
+            for member in archive.namelist():
+                name = os.path.basename(member)
+                if name.startswith('taxi_zones.'):
+                    with open(os.path.join(target, name), 'wb') as f:
+                        f.write(archive.read(member))
+        return os.path.exists(ZONE_SHAPEFILE)
+
+    except Exception as e:
+        print(f"   ⚠️  Could not fetch taxi zone shapefile: {e}")
+        return False
+
+
+def _read_dbf_ids(path, field='LocationID'):
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    n_records, header_len, record_len = struct.unpack('<IHH', data[4:12])
+    fields = []
+    offset = 1  # deletion flag
+    pos = 32
+    while data[pos] != 0x0D:
+        name = data[pos:pos + 11].split(b'\x00')[0].decode()
+        length = data[pos + 16]
+        fields.append((name, offset, length))
+        offset += length
+        pos += 32
+
+    _, start, length = next(f for f in fields if f[0].lower() == field.lower())
+    ids = []
+    for i in range(n_records):
+        record = header_len + i * record_len
+        ids.append(int(float(data[record + start:record + start + length].decode().strip() or -1)))
+    return ids
+
+
+def _read_shp_rings(path):
+    # Polygon records only (shape type 5); each record is a list of rings
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    shapes = []
+    pos = 100
+    while pos < len(data):
+        content_len = struct.unpack('>i', data[pos + 4:pos + 8])[0] * 2
+        content = data[pos + 8:pos + 8 + content_len]
+        pos += 8 + content_len
+
+        if struct.unpack('<i', content[:4])[0] != 5:
+            shapes.append([])
+            continue
+
+        n_parts, n_points = struct.unpack('<ii', content[36:44])
+        parts = np.frombuffer(content, dtype='<i4', count=n_parts, offset=44)
+        points = np.frombuffer(content, dtype='<f8', count=2 * n_points, offset=44 + 4 * n_parts)
+        points = points.reshape(-1, 2)
+        bounds = list(parts) + [n_points]
+        shapes.append([points[bounds[i]:bounds[i + 1]] for i in range(n_parts)])
+
+    return shapes
+
+
+def read_zone_shapes(shapefile=ZONE_SHAPEFILE):
+    ids = _read_dbf_ids(os.path.splitext(shapefile)[0] + '.dbf')
+    shapes = _read_shp_rings(shapefile)
+
+    # Some zones are split over several records
+    rings = {}
+    for zone, zone_rings in zip(ids, shapes):
+        if 0 < zone < N_LOCATIONS and zone_rings:
+            rings.setdefault(zone, []).extend(zone_rings)
+    return rings
+
+
+def _lcc_m(phi):
+    return np.cos(phi) / np.sqrt(1 - (GRS80_E * np.sin(phi)) ** 2)
+
+
+def _lcc_t(phi):
+    e_sin = GRS80_E * np.sin(phi)
+    return np.tan(np.pi / 4 - phi / 2) / ((1 - e_sin) / (1 + e_sin)) ** (GRS80_E / 2)
+
+
+def state_plane_to_lonlat(points):
+    # Inverse Lambert conformal conic (Snyder, Map Projections, eq. 15-9 to 15-11)
+    phi1, phi2 = LCC_PARALLELS
+    phi0, lam0 = LCC_ORIGIN
+    n = (np.log(_lcc_m(phi1)) - np.log(_lcc_m(phi2))) / (np.log(_lcc_t(phi1)) - np.log(_lcc_t(phi2)))
+    big_f = _lcc_m(phi1) / (n * _lcc_t(phi1) ** n)
+    rho0 = GRS80_A * big_f * _lcc_t(phi0) ** n
+
+    x = points[:, 0] * US_FOOT - LCC_FALSE_EASTING
+    y = points[:, 1] * US_FOOT
+    rho = np.hypot(x, rho0 - y)
+    theta = np.arctan2(x, rho0 - y)
+    t = (rho / (GRS80_A * big_f)) ** (1 / n)
+
+    phi = np.pi / 2 - 2 * np.arctan(t)
+    for _ in range(6):
+        e_sin = GRS80_E * np.sin(phi)
+        phi = np.pi / 2 - 2 * np.arctan(t * ((1 - e_sin) / (1 + e_sin)) ** (GRS80_E / 2))
+
+    return np.column_stack([np.degrees(theta / n + lam0), np.degrees(phi)])
+
+
+def _to_lonlat(rings):
+    all_points = np.concatenate([r for zone in rings.values() for r in zone])
+    if np.abs(all_points).max() <= 180:
+        return rings
+    return {zone: [state_plane_to_lonlat(r) for r in zone_rings] for zone, zone_rings in rings.items()}
+
+
+def simplify_ring(ring, tolerance=MAP_SIMPLIFY_TOLERANCE):
+    # Douglas-Peucker; closed rings keep at least four points
+    keep = np.zeros(len(ring), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(ring) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = ring[end] - ring[start]
+        offsets = ring[start + 1:end] - ring[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            dist = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            dist = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack += [(start, split), (split, end)]
+
+    simplified = ring[keep]
+    if len(simplified) < 4:
+        idx = np.unique(np.linspace(0, len(ring) - 1, 4).astype(int))
+        simplified = ring[idx]
+    return simplified
+
+
+def _signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return (x * np.roll(y, -1) - np.roll(x, -1) * y).sum() / 2
+
+
+def _contains(ring, point):
+    x, y = ring[:, 0], ring[:, 1]
+    x1, y1 = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > point[1]) != (y1 > point[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x + (point[1] - y) * (x1 - x) / (y1 - y)
+    return bool(np.sum(crosses & (point[0] < x_cross)) % 2)
+
+
+def _polygons(zone_rings):
+    # Shapefile outer rings run clockwise and holes counter-clockwise; each
+    # hole is attached to the outer ring that contains it
+    outers = [r for r in zone_rings if _signed_area(r) <= 0]
+    holes = [r for r in zone_rings if _signed_area(r) > 0]
+    if not outers:
+        outers, holes = holes, []
+
+    polygons = [[outer] for outer in outers]
+    for hole in holes:
+        owner = next((p for p in polygons if _contains(p[0], hole[0])), polygons[0])
+        owner.append(hole)
+    return polygons
+
+
+def build_zone_geojson(shapefile=ZONE_SHAPEFILE, tolerance=MAP_SIMPLIFY_TOLERANCE):
+    print(f"🗺️  Simplifying zone outlines from {os.path.basename(shapefile)}...")
+    rings = _to_lonlat(read_zone_shapes(shapefile))
+
+    features = []
+    n_before = n_after = 0
+    for zone, zone_rings in sorted(rings.items()):
+        polygons = []
+        for polygon in _polygons(zone_rings):
+            simplified = [simplify_ring(r, tolerance) for r in polygon]
+            n_before += sum(len(r) for r in polygon)
+            n_after += sum(len(r) for r in simplified)
+            polygons.append([np.round(r, MAP_COORD_DECIMALS).tolist() for r in simplified])
+        features.append({
+            'type': 'Feature',
+            'id': int(zone),
+            'properties': {'LocationID': int(zone)},
+            'geometry': {'type': 'MultiPolygon', 'coordinates': polygons}
+        })
+
+    geojson = {'type': 'FeatureCollection', 'features': features}
+    os.makedirs(os.path.dirname(ZONE_GEOJSON_FILE), exist_ok=True)
+    with open(ZONE_GEOJSON_FILE, 'w') as f:
+        json.dump(geojson, f, separators=(',', ':'))
+
+    size_kb = os.path.getsize(ZONE_GEOJSON_FILE) / 1024
+    print(f"💾 Saved {len(features)} zones: {n_before:,} -> {n_after:,} vertices ({size_kb:,.0f} KB)")
+    return geojson
+
+
+def load_zone_geojson():
+    if os.path.exists(ZONE_GEOJSON_FILE):
+        with open(ZONE_GEOJSON_FILE) as f:
+            return json.load(f)
+    if os.path.exists(ZONE_SHAPEFILE):
+        return build_zone_geojson()
+    return None
+
+
+if __name__ == '__main__':
+    if fetch_zone_shapefile():
+        build_zone_geojson()
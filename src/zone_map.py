@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from src.config import N_LOCATIONS
+from src.od_matrix import ZONE_MASK, combine_od, od_layer, od_zone_entries
+
+MAP_METRICS = {
+    'entries': 'Trips entering the zone (by dropoff zone)',
+    'leakage': 'Entries without surcharge (by pickup zone)',
+    'dropoff_change_pct': 'Dropoff change vs same period a year earlier (%)',
+    'avg_speed_mph': 'Average speed of pickups (mph)'
+}
+
+
+def map_periods(od):
+    # Single months plus whole years, e.g. '2025-03' and '2025'; a month
+    # split at the toll start shows up once
+    months = sorted({period[:7] for period in od})
+    years = sorted({period[:4] for period in months})
+    return months + years
+
+
+def _select(od, period):
+    year = int(period[:4])
+    months = [int(period[5:7])] if len(period) > 4 else None
+    return combine_od(od, year=year, months=months)
+
+
+def _prior(period):
+    return f'{int(period[:4]) - 1}{period[4:]}'
+
+
+def zone_metric_frame(od, period):
+    layers = _select(od, period)
+    prior = _select(od, _prior(period))
+    trips = od_layer(layers, 'trips')
+
+    # Entries land in a zone cell from outside; leakage is charged to the pickup zone
+    entries = np.where(ZONE_MASK, trips[~ZONE_MASK].sum(axis=0), 0)
+    leakage = od_zone_entries(layers, 'no_surcharge')
+
+    dropoffs = trips.sum(axis=0)
+    prior_dropoffs = od_layer(prior, 'trips').sum(axis=0)
+    hours = od_layer(layers, 'duration_hours').sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.where(prior_dropoffs > 0, (dropoffs - prior_dropoffs) / prior_dropoffs * 100, np.nan)
+        speed = np.where(hours > 0, od_layer(layers, 'distance').sum(axis=1) / hours, np.nan)
+
+    frame = pd.DataFrame({
+        'LocationID': np.arange(N_LOCATIONS),
+        'entries': entries.astype(np.int64),
+        'leakage': leakage.astype(np.int64),
+        'dropoff_change_pct': change,
+        'avg_speed_mph': speed
+    })
+    return frame.iloc[1:].reset_index(drop=True)
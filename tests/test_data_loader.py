@@ -0,0 +1,66 @@
+import dask.dataframe as dd
+import pandas as pd
+import numpy as np
+import pytest
+from src.config import UNIFIED_SCHEMA
+from src.data_loader import read_row_group, load_files
+from src.cleaners import remove_duplicate_trips
+
+
+def _write_month(path, month, n=40, drop=(), repeat=0):
+    pickup = pd.date_range(f'2025-{month:02d}-02', periods=n, freq='37min').as_unit('us')
+    df = pd.DataFrame({
+        'tpep_pickup_datetime': pickup,
+        'tpep_dropoff_datetime': pickup + pd.Timedelta(minutes=12),
+        'PULocationID': np.arange(n, dtype=np.int32) % 200 + 1,
+        'DOLocationID': np.arange(n, dtype=np.int32) % 150 + 40,
+        'trip_distance': np.linspace(0.5, 8, n),
+        'fare_amount': np.linspace(5, 40, n),
+        'tip_amount': np.linspace(0, 6, n),
+        'total_amount': np.linspace(8, 50, n),
+        'congestion_surcharge': np.full(n, 2.5)
+    }).drop(columns=list(drop))
+    # Copies of the first rows land in the last row group
+    df = pd.concat([df, df.head(repeat)], ignore_index=True)
+    df.to_parquet(path, row_group_size=n // 2, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize('dtype_backend', [None, 'pyarrow'])
+def test_row_groups_of_file_missing_a_column_match_full_schema(tmp_path, dtype_backend):
+    full = _write_month(tmp_path / 'yellow_tripdata_2025-02.parquet', 2)
+    partial = _write_month(tmp_path / 'yellow_tripdata_2025-03.parquet', 3, drop=['congestion_surcharge'])
+    plan = [
+        {'path': path, 'row_group': rg, 'taxi_type': 'yellow'}
+        for path in (full, partial) for rg in range(2)
+    ]
+    ddf = dd.from_map(read_row_group, plan, dtype_backend=dtype_backend)
+    df = ddf.compute()
+
+    assert list(df.columns) == list(UNIFIED_SCHEMA) + ['taxi_type', 'source_file']
+    missing = df[df['source_file'] == 'yellow_tripdata_2025-03.parquet']['congestion_surcharge']
+    assert len(missing) == 40 and missing.isna().all()
+    assert df['congestion_surcharge'].dtype == ddf['congestion_surcharge'].dtype
+
+
+def test_dedup_runs_on_planned_read_with_missing_column(tmp_path, monkeypatch):
+    monkeypatch.setattr('src.cleaners.DATA_AUDIT', str(tmp_path / 'audit'))
+    full = _write_month(tmp_path / 'yellow_tripdata_2025-02.parquet', 2)
+    partial = _write_month(
+        tmp_path / 'yellow_tripdata_2025-03.parquet', 3, drop=['congestion_surcharge'], repeat=5
+    )
+    plan = [
+        {'path': path, 'row_group': rg, 'taxi_type': 'yellow'}
+        for path in (partial, full) for rg in range(3 if path == partial else 2)
+    ]
+    deduped, duplicates = remove_duplicate_trips(dd.from_map(read_row_group, plan))
+
+    # A failed dedup falls back to the input (85 rows) and no duplicates
+    assert len(duplicates) == 5
+    assert len(deduped.compute()) == 80
+
+
+def test_load_files_fills_missing_column(tmp_path):
+    partial = _write_month(tmp_path / 'green_tripdata_2025-03.parquet', 3, drop=['congestion_surcharge'])
+    df = load_files([partial]).compute()
+    assert df['congestion_surcharge'].isna().all()